@@ -9,6 +9,8 @@ API_TOKEN = os.getenv("API_TOKEN")
 API_ID = os.getenv("API_ID")
 API_HASH = os.getenv("API_HASH")
 MONGO_URI = os.getenv("MONGO_URI")
+# The forwarder's local stats endpoint, read by /stats; comma-separate one URL per sharded worker
+FORWARDER_STATS_URL = os.getenv("FORWARDER_STATS_URL", "http://127.0.0.1:9108")
 
 # Ensure mandatory variables are present
 if not API_TOKEN or not API_ID or not API_HASH or not MONGO_URI:
@@ -19,3 +21,5 @@ LOGIN_TIMEOUT = 300  # Timeout for stale login sessions
 MAX_OTP_RETRIES = 3
 GROUPS_PER_PAGE = 20
 CUSTOM_FOLDER = "sessions"
+# Destination kinds a call can be forwarded to; the default when a user never ran /forward_to
+FORWARD_TO_CHOICES = ("dm", "group", "trading_bot")
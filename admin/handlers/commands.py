@@ -1,5 +1,6 @@
 from aiogram import types, Dispatcher
-from admin.utils.mongodb import get_or_create_user, delete_user_session
+from telethon import utils
+from admin.utils.mongodb import get_or_create_user, delete_user_session, update_user
 from admin.templates.messages import (
     WELCOME_MESSAGE,
     HELP_MESSAGE,
@@ -7,6 +8,14 @@ from admin.templates.messages import (
     INVALID_INPUT_MESSAGE,
     TRADING_BOT_SET_MESSAGE,
     TRADING_BOT_SETUP_ERROR_MESSAGE,
+    FORWARD_TO_SET_MESSAGE,
+    FORWARD_TO_USAGE_MESSAGE,
+    STATS_HEADER,
+    STATS_STAGE_LINE,
+    STATS_OUTBOX_LINE,
+    STATS_CLIENT_LINE,
+    NO_STATS_MESSAGE,
+    STATS_UNAVAILABLE_MESSAGE,
     SESSION_UNAUTHORIZED_MESSAGE,
     DESTINATION_GROUP_SET_MESSAGE,
     NO_GROUPS_FOUND_MESSAGE,
@@ -16,8 +25,11 @@ from admin.utils.telegram import (
     log_out_user,
     get_user_dialogs,
     get_full_channel,
+    get_peer_id,
 )
-from admin.config import GROUPS_PER_PAGE
+from admin.utils.stats import fetch_forwarder_stats
+from admin.utils.sessions import session_store
+from admin.config import GROUPS_PER_PAGE, FORWARD_TO_CHOICES
 
 
 @handle_exceptions()
@@ -27,7 +39,7 @@ async def start_command(message: types.Message):
     """
     user_id = message.from_user.id
     username = message.from_user.username
-    get_or_create_user(user_id, username)
+    await get_or_create_user(user_id, username)
     await message.reply(WELCOME_MESSAGE, parse_mode="Markdown")
 
 
@@ -48,7 +60,9 @@ async def logout_command(message: types.Message):
     user_id = message.from_user.id
     success = await log_out_user(user_id)
     if success:
-        delete_user_session(user_id)
+        # Drop state queued by the logout itself so a later flush cannot restore the session
+        session_store.discard(user_id)
+        await delete_user_session(user_id)
         await message.reply(RESET_CONFIG_MESSAGE)
     else:
         await message.reply(SESSION_UNAUTHORIZED_MESSAGE)
@@ -89,11 +103,12 @@ async def set_destination_command(message: types.Message):
     group_name = args[1]
     try:
         group = await get_full_channel(user_id, group_name)
-        destination_group_id = group.chats[0].id
+        # Store the marked ID (-100...) the forwarder sends to, not the bare channel ID
+        destination_group_id = utils.get_peer_id(group.chats[0])
 
         # Update user's destination group in MongoDB
-        get_or_create_user(user_id)  # Ensure the user exists
-        delete_user_session(user_id)
+        await get_or_create_user(user_id)  # Ensure the user exists
+        await update_user(user_id, {"destination_group_id": destination_group_id})
         await message.reply(DESTINATION_GROUP_SET_MESSAGE.format(group_id=destination_group_id))
     except Exception as e:
         await message.reply(f"❌ Error setting destination group: {e}")
@@ -114,13 +129,31 @@ async def tradingbot_command(message: types.Message):
 
     bot_info = args[1]
     try:
-        # Assume Telethon handles this with get_entity
-        trading_bot_id = int(bot_info) if bot_info.isdigit() else await get_full_channel(user_id, bot_info)
+        # Bots are users, so resolve the username to a peer ID rather than a channel
+        trading_bot_id = int(bot_info) if bot_info.isdigit() else await get_peer_id(user_id, bot_info)
+        await update_user(user_id, {"trading_bot_id": trading_bot_id})
         await message.reply(TRADING_BOT_SET_MESSAGE.format(bot_name=bot_info, bot_id=trading_bot_id))
     except Exception as e:
         await message.reply(TRADING_BOT_SETUP_ERROR_MESSAGE.format(error=str(e)))
 
 
+@handle_exceptions()
+@is_logged_in()
+async def forward_to_command(message: types.Message):
+    """
+    Handle the /forward_to command. Choose which destinations each call is sent to.
+    """
+    user_id = message.from_user.id
+    kinds = message.text.strip().split()[1:]
+
+    if not kinds or any(kind not in FORWARD_TO_CHOICES for kind in kinds):
+        await message.reply(FORWARD_TO_USAGE_MESSAGE.format(choices=" ".join(FORWARD_TO_CHOICES)))
+        return
+
+    await update_user(user_id, {"forward_to": list(dict.fromkeys(kinds))})
+    await message.reply(FORWARD_TO_SET_MESSAGE.format(destinations=", ".join(dict.fromkeys(kinds))))
+
+
 @handle_exceptions()
 @is_logged_in()
 async def view_config_command(message: types.Message):
@@ -128,17 +161,52 @@ async def view_config_command(message: types.Message):
     Handle the /view_config command. Show the user's current configuration.
     """
     user_id = message.from_user.id
-    user = get_or_create_user(user_id)
+    user = await get_or_create_user(user_id)
 
     config = (
         f"Your current configuration:\n"
         f"- Session Name: {user.get('session_name', 'Not set')}\n"
         f"- Destination Group ID: {user.get('destination_group_id', 'Not set')}\n"
-        f"- Trading Bot ID: {user.get('trading_bot_id', 'Not set')}"
+        f"- Trading Bot ID: {user.get('trading_bot_id', 'Not set')}\n"
+        f"- Forward To: {', '.join(user.get('forward_to') or FORWARD_TO_CHOICES)}"
     )
     await message.reply(config)
 
 
+@handle_exceptions()
+@is_logged_in()
+async def stats_command(message: types.Message):
+    """
+    Handle the /stats command. Show the user's call latency per stage and connection health from the forwarder.
+    """
+    user_id = message.from_user.id
+    try:
+        stats = await fetch_forwarder_stats(user_id)
+    except Exception as e:
+        await message.reply(STATS_UNAVAILABLE_MESSAGE.format(error=e))
+        return
+
+    client = stats["clients"].get(str(user_id))
+    client_line = STATS_CLIENT_LINE.format(**client) if client else None
+    if not stats["stages"]:
+        await message.reply(f"{client_line}\n{NO_STATS_MESSAGE}" if client_line else NO_STATS_MESSAGE)
+        return
+
+    lines = [STATS_HEADER]
+    for stage, summary in stats["stages"].items():
+        lines.append(STATS_STAGE_LINE.format(
+            stage=stage,
+            p50=f"{summary['p50'] * 1000:.1f}",
+            p99=f"{summary['p99'] * 1000:.1f}",
+            max=f"{summary['max'] * 1000:.1f}",
+            count=summary["count"],
+        ))
+    lines.append(STATS_OUTBOX_LINE.format(**stats["outbox"]))
+    if client_line:
+        lines.append(client_line)
+    await message.reply("\n".join(lines))
+
+
 @handle_exceptions()
 @is_logged_in()
 async def reset_config_command(message: types.Message):
@@ -146,7 +214,7 @@ async def reset_config_command(message: types.Message):
     Handle the /reset_config command. Reset the user's configuration to defaults.
     """
     user_id = message.from_user.id
-    delete_user_session(user_id)
+    await delete_user_session(user_id)
     await message.reply(RESET_CONFIG_MESSAGE)
 
 
@@ -160,5 +228,7 @@ def register_commands(dp: Dispatcher):
     dp.register_message_handler(list_groups_command, commands=["list_groups"])
     dp.register_message_handler(set_destination_command, commands=["set_destination"])
     dp.register_message_handler(tradingbot_command, commands=["tradingbot"])
+    dp.register_message_handler(forward_to_command, commands=["forward_to"])
     dp.register_message_handler(view_config_command, commands=["view_config"])
+    dp.register_message_handler(stats_command, commands=["stats"])
     dp.register_message_handler(reset_config_command, commands=["reset_config"])
\ No newline at end of file
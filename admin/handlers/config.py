@@ -18,7 +18,7 @@ async def view_config_command(message: types.Message):
     Handle the /view_config command. Show the user's current configuration.
     """
     user_id = message.from_user.id
-    user = get_or_create_user(user_id)
+    user = await get_or_create_user(user_id)
 
     config = (
         f"Your current configuration:\n"
@@ -37,7 +37,7 @@ async def reset_config_command(message: types.Message):
     """
     user_id = message.from_user.id
     # Reset user configuration in MongoDB
-    update_user(user_id, {"destination_group_id": None, "trading_bot_id": None})
+    await update_user(user_id, {"destination_group_id": None, "trading_bot_id": None})
     await message.reply(RESET_CONFIG_MESSAGE)
 
 
@@ -57,7 +57,7 @@ async def set_destination_command(message: types.Message):
     group_id_or_username = args[1]
     try:
         # Update the user's destination group ID
-        update_user(user_id, {"destination_group_id": group_id_or_username})
+        await update_user(user_id, {"destination_group_id": group_id_or_username})
         await message.reply(DESTINATION_GROUP_SET_MESSAGE.format(group_id=group_id_or_username))
     except Exception as e:
         await message.reply(f"❌ Error setting destination group: {e}")
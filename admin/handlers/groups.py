@@ -3,7 +3,7 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from telethon import TelegramClient
 from admin.utils.decorators import handle_exceptions, is_logged_in
 from admin.utils.telegram import get_user_dialogs
-from admin.utils.mongodb import get_or_create_user
+from admin.utils.mongodb import get_or_create_user, find_group_configs, toggle_group_active
 from admin.templates.messages import (
     NO_GROUPS_FOUND_MESSAGE,
     INVALID_INPUT_MESSAGE,
@@ -14,7 +14,6 @@ from admin.config import API_ID, API_HASH, GROUPS_PER_PAGE
 
 # In-memory storage for session data
 pending_logins = {}
-selected_groups = set()  # Use a set for efficient toggling
 
 
 @handle_exceptions()
@@ -24,7 +23,7 @@ async def list_groups_command(message: types.Message, bot: Bot):
     Handle the /list_groups command. List all Telegram groups and channels with pagination.
     """
     user_id = message.from_user.id
-    user = get_or_create_user(user_id)
+    user = await get_or_create_user(user_id)
 
     try:
         # Fetch groups using Telethon
@@ -58,10 +57,8 @@ async def toggle_group(call: types.CallbackQuery, bot: Bot):
     user_id = call.from_user.id
 
     if user_id in pending_logins and "groups" in pending_logins[user_id]:
-        if group_id in selected_groups:
-            selected_groups.remove(group_id)
-        else:
-            selected_groups.add(group_id)
+        # Toggled against this user's stored config, which the forwarder's chat filter follows
+        await toggle_group_active(user_id, group_id)
 
     # Refresh the group page
     await send_group_page(bot, call.message.chat.id, user_id, page)
@@ -112,12 +109,16 @@ async def send_group_page(bot: Bot, chat_id: int, user_id: int, page: int) -> No
     start_idx, end_idx = page * GROUPS_PER_PAGE, (page + 1) * GROUPS_PER_PAGE
     groups_to_display = group_list[start_idx:end_idx]
 
+    # Groups are forwarded only when this user's config has them active
+    configs = await find_group_configs({"user_id": user_id})
+    active = {str(config["group_id"]) for config in configs if config.get("active", True)}
+
     # Create markup
     markup = InlineKeyboardMarkup(row_width=4)
 
     # Add groups as buttons
     for group in groups_to_display:
-        toggle_state = "❌" if group["id"] in selected_groups else "✅"
+        toggle_state = "✅" if str(group["id"]) in active else "❌"
         button_label = f"{toggle_state} {group['name']}"
         markup.add(InlineKeyboardButton(button_label, callback_data=f"toggle_group:{group['id']}:{page}"))
 
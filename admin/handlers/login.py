@@ -1,10 +1,11 @@
 from aiogram import types, Dispatcher, Bot
 from telethon import TelegramClient
 from telethon.errors import SessionPasswordNeededError, FloodWaitError
-from admin.utils.sessions import MongoSession
-from admin.utils.mongodb import get_or_create_user, users_collection
+from admin.utils.sessions import MongoSession, session_store
+from admin.utils.mongodb import get_or_create_user, update_user
 from admin.config import API_ID, API_HASH, CUSTOM_FOLDER
 from typing import Dict
+from datetime import datetime, timezone
 import os
 
 # In-memory storage for pending login states
@@ -21,7 +22,7 @@ async def start_login(message: types.Message):
     """
     user_id = message.from_user.id
     username = message.from_user.username
-    user = get_or_create_user(user_id, username)
+    user = await get_or_create_user(user_id, username)
 
     # Check if the user is already logged in
     if "session_name" in user:
@@ -46,7 +47,7 @@ async def handle_phone_number(message: types.Message):
         return
 
     # Use MongoSession for Telethon
-    session = MongoSession(user_id)
+    session = await MongoSession.create(user_id)
     client = TelegramClient(session, API_ID, API_HASH)
     pending_logins[user_id].update({"client": client, "phone": phone_number, "awaiting_otp": True})
 
@@ -88,14 +89,15 @@ async def handle_otp(message: types.Message):
         # Attempt login
         await client.sign_in(phone=phone_number, code=otp)
 
-        # Save session to MongoDB
-        users_collection.update_one(
-            {"_id": user_id},
+        # Write the new auth key before the forwarder is told about the login
+        await session_store.flush()
+        await update_user(
+            user_id,
             {
-                "$set": {
-                    "session_name": f"{CUSTOM_FOLDER}/session_{user_id}",
-                    "phone_number": phone_number
-                }
+                "session_name": f"{CUSTOM_FOLDER}/session_{user_id}",
+                # Lets the forwarder tell a new login apart from the previous one
+                "logged_in_at": datetime.now(timezone.utc),
+                "phone_number": phone_number
             },
             upsert=True
         )
@@ -129,15 +131,16 @@ async def handle_2fa_password(message: types.Message):
         # Attempt 2FA login
         await client.sign_in(password=password)
 
-        # Save session to MongoDB
+        # Write the new auth key before the forwarder is told about the login
+        await session_store.flush()
         phone_number = pending_logins[user_id]["phone"]
-        users_collection.update_one(
-            {"_id": user_id},
+        await update_user(
+            user_id,
             {
-                "$set": {
-                    "session_name": f"{CUSTOM_FOLDER}/session_{user_id}",
-                    "phone_number": phone_number
-                }
+                "session_name": f"{CUSTOM_FOLDER}/session_{user_id}",
+                # Lets the forwarder tell a new login apart from the previous one
+                "logged_in_at": datetime.now(timezone.utc),
+                "phone_number": phone_number
             },
             upsert=True
         )
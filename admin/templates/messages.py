@@ -21,8 +21,10 @@ HELP_MESSAGE = (
     "/list_groups - List all your Telegram groups and channels\n"
     "/set_destination - Set the destination group ID\n"
     "/tradingbot - Set Trading bot\n"
+    "/forward_to - Choose where calls are sent (dm, group, trading_bot)\n"
     "/set_notifier - Assign a notifier to a group\n"
     "/view_config - View your current configuration\n"
+    "/stats - Show forwarding latency per stage\n"
     "/reset_config - Reset all your configuration to default\n"
 )
 
@@ -76,6 +78,18 @@ TRADING_BOT_SET_MESSAGE = "✅ Trading bot set to: {bot_name} (ID: {bot_id})"
 # Message when the trading bot setup fails
 TRADING_BOT_SETUP_ERROR_MESSAGE = "❌ Error setting trading bot: {error}"
 
+# Destination selection messages
+FORWARD_TO_SET_MESSAGE = "✅ Calls will be forwarded to: {destinations}"
+FORWARD_TO_USAGE_MESSAGE = "Usage: /forward_to <destinations>, choosing from: {choices}"
+
+# /stats messages
+STATS_HEADER = "📊 Forwarding latency (p50 / p99 / max):"
+STATS_STAGE_LINE = "- {stage}: {p50} / {p99} / {max} ms ({count} calls)"
+STATS_OUTBOX_LINE = "📤 Outbox: {depth} queued, {sent} sent, {retries} retries, {flood_waits} FloodWaits, {dropped} dropped"
+STATS_CLIENT_LINE = "🔌 Connection: {state}, last update {idle_seconds:.0f}s ago, {reconnects} reconnects, {stalls} stalls"
+NO_STATS_MESSAGE = "No calls forwarded yet since the forwarder started."
+STATS_UNAVAILABLE_MESSAGE = "❌ The forwarder stats endpoint is not reachable: {error}"
+
 # Pagination navigation buttons
 NEXT_PAGE_BUTTON = "Next ➡️"
 PREVIOUS_PAGE_BUTTON = "⬅️ Back"
@@ -1,4 +1,4 @@
 # Importing necessary modules
-from .mongodb import get_or_create_user, update_user, users_collection
+from .mongodb import get_or_create_user, update_user, bump_config_version, users_collection
 from .sessions import MongoSession
 from .decorators import handle_exceptions, is_logged_in
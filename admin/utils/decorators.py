@@ -3,7 +3,7 @@ from functools import wraps
 from aiogram import types
 from aiogram.dispatcher.middlewares import BaseMiddleware
 from telethon.errors import UnauthorizedError
-from admin.utils.mongodb import users_collection
+from admin.utils.mongodb import get_user
 
 def is_logged_in():
     """
@@ -13,7 +13,7 @@ def is_logged_in():
         @wraps(func)
         async def wrapper(message: types.Message, *args, **kwargs):
             user_id = message.from_user.id
-            user = users_collection.find_one({"_id": user_id})
+            user = await get_user(user_id, fields=["session_name"])
             if not user or "session_name" not in user:
                 await message.reply("⚠️ You must log in first using /login.")
                 return
@@ -0,0 +1,30 @@
+import aiohttp
+from admin.config import FORWARDER_STATS_URL
+
+
+async def fetch_forwarder_stats(user_id: int) -> dict:
+    """
+    Fetch a user's call latency, outbox summary and connection health from the
+    forwarder's stats endpoints; with sharded workers only the one running the
+    user has data.
+
+    Args:
+        user_id (int): The Telegram user ID.
+
+    Returns:
+        dict: "stages" (stage -> count, max, p50, p99 in seconds), "outbox" counters and
+            "clients" (the user's connection health, keyed by user ID).
+
+    Raises:
+        aiohttp.ClientError: If the forwarder is not reachable.
+    """
+    timeout = aiohttp.ClientTimeout(total=5)
+    stats = None
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        for url in FORWARDER_STATS_URL.split(","):
+            async with session.get(f"{url.strip()}/stats", params={"user": str(user_id)}) as response:
+                response.raise_for_status()
+                stats = await response.json()
+            if stats["stages"] or stats["clients"]:
+                break
+    return stats
@@ -19,7 +19,7 @@ async def with_telegram_client(user_id: int, coro):
     Raises:
         Exception: If any error occurs during client operation.
     """
-    session = MongoSession(user_id)
+    session = await MongoSession.create(user_id)
     client = TelegramClient(session, API_ID, API_HASH)
     await client.connect()
     try:
@@ -46,6 +46,22 @@ async def get_full_channel(user_id: int, channel_name: str):
 
     return await with_telegram_client(user_id, fetch_channel)
 
+async def get_peer_id(user_id: int, name: str) -> int:
+    """
+    Resolve a username or link to the marked chat ID the forwarder sends to.
+
+    Args:
+        user_id (int): The Telegram user ID.
+        name (str): The bot, user or chat username (e.g., "@bonkbot_bot").
+
+    Returns:
+        int: The marked peer ID.
+    """
+    async def fetch_peer_id(client):
+        return await client.get_peer_id(name)
+
+    return await with_telegram_client(user_id, fetch_peer_id)
+
 async def get_user_dialogs(user_id: int):
     """
     Retrieve the user's dialogs (chats, groups, and channels).
@@ -0,0 +1,75 @@
+"""
+Bloom front for CA dedupe: memory and lookup cost of a rotating Bloom filter
+pair vs. the plain dict and the exact DedupeStore.
+
+Run from the repository root:
+    python -m benchmarks.bench_bloom
+"""
+import os
+import time
+import tracemalloc
+from forwarder.constants import TIME_THRESHOLD
+from forwarder.dedupe import DedupeStore
+
+KEYS = 1_000_000
+PROBES = 200_000
+FP_RATE = 0.001
+
+
+class FakeClock:
+    """Advances a full TTL over the fill so every time bucket is populated."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def measure(label, contains, probes, hit_label="false hits"):
+    start = time.perf_counter()
+    hits = 0
+    for key in probes:
+        hits += contains(key)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed / len(probes) * 1e9:6.0f} ns/lookup  {hit_label}={hits}")
+
+
+def main():
+    keys = [os.urandom(32) for _ in range(KEYS)]
+    absent = [os.urandom(32) for _ in range(PROBES)]
+    step = TIME_THRESHOLD / KEYS
+
+    tracemalloc.start()
+    plain = {key.hex(): time.time() for key in keys}
+    dict_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stores = {}
+    for label, fp_rate in (("DedupeStore", None), ("DedupeStore + Bloom", FP_RATE)):
+        clock = FakeClock()
+        store = DedupeStore(capacity=KEYS, clock=clock, bloom_fp_rate=fp_rate)
+        for key in keys:
+            store.add(key)
+            clock.now += step
+        stores[label] = store
+
+    bloom = stores["DedupeStore + Bloom"].stats()["bloom"]
+    print(f"{KEYS:,} keys")
+    print(f"  plain dict of CA strings     {dict_bytes / 2**20:7.1f} MiB")
+    print(f"  Bloom filter pair            {bloom['bytes'] / 2**20:7.1f} MiB "
+          f"({bloom['hashes']} hashes, estimated fp rate {bloom['estimated_fp_rate']:.4%})")
+
+    print("lookups of new (absent) CAs:")
+    absent_hex = [key.hex() for key in absent]
+    measure("plain dict", plain.__contains__, absent_hex)
+    for label, store in stores.items():
+        measure(label, store.contains, absent)
+
+    print("lookups of known CAs:")
+    known = keys[-PROBES:]
+    for label, store in stores.items():
+        measure(label, store.contains, known, "hits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cold start of many user clients: one at a time (the old loop) vs. the
+semaphore-bounded concurrent start, with fake clients that take 50-300 ms to
+connect, some unauthorized sessions and one account that never connects.
+
+Run from the repository root:
+    python -m benchmarks.bench_client_startup
+"""
+import asyncio
+import logging
+import random
+import time
+from forwarder.startup import start_clients
+
+USERS = 300
+UNAUTHORIZED = 0.1  # fraction of sessions that were logged out
+CONNECT_LATENCY = (0.05, 0.3)
+TIMEOUT = 2
+
+
+class FakeClient:
+    """Connects after a random delay; one account hangs forever."""
+    def __init__(self, user):
+        self.user = user
+
+    async def connect(self):
+        if self.user["hang"]:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.user["latency"])
+
+    async def is_user_authorized(self):
+        return self.user["authorized"]
+
+    async def disconnect(self):
+        pass
+
+
+async def run(label, users, limit):
+    start = time.perf_counter()
+    ready = []
+    _, skipped = await start_clients(
+        users, FakeClient, lambda client, user: ready.append(time.perf_counter() - start), limit=limit, timeout=TIMEOUT
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<22} first listening={ready[0] * 1e3:6.0f} ms  all listening={max(ready):6.2f} s  "
+        f"done={elapsed:6.2f} s  started={len(ready)} skipped={len(skipped)}"
+    )
+
+
+async def main():
+    # Skipped accounts are counted below rather than logged one by one
+    logging.disable(logging.WARNING)
+    rng = random.Random(1)
+    users = [
+        {
+            "_id": user_id,
+            "latency": rng.uniform(*CONNECT_LATENCY),
+            "authorized": rng.random() >= UNAUTHORIZED,
+            "hang": user_id == 0,
+        }
+        for user_id in range(USERS)
+    ]
+    print(f"{USERS} users, {CONNECT_LATENCY[0] * 1e3:.0f}-{CONNECT_LATENCY[1] * 1e3:.0f} ms to connect, one hung account ({TIMEOUT}s timeout)")
+    await run("one at a time", users, limit=1)
+    for limit in (20, 50):
+        await run(f"concurrent, limit {limit}", users, limit=limit)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
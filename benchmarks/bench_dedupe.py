@@ -0,0 +1,83 @@
+"""
+Per-destination dedupe at 1M keys: a timestamped dict keyed by
+(destination, CA string) vs. DedupeStore with decoded 32-byte keys in
+per-scope time buckets.
+
+Run from the repository root:
+    python -m benchmarks.bench_dedupe
+"""
+import os
+import time
+import tracemalloc
+from forwarder.dedupe import DedupeStore
+from forwarder.validation import BASE58_ALPHABET, decode_address
+
+KEYS = 1_000_000
+DESTINATIONS = 10
+
+
+def random_address():
+    """A random base58 address that decodes to 32 bytes."""
+    raw = os.urandom(32)
+    value = int.from_bytes(raw, "big")
+    chars = []
+    while value:
+        value, digit = divmod(value, 58)
+        chars.append(BASE58_ALPHABET[digit])
+    leading = len(raw) - len(raw.lstrip(b"\0"))
+    return "1" * leading + "".join(reversed(chars))
+
+
+def fill_dict(addresses, destinations):
+    """The pre-DedupeStore layout: {(destination, ca): timestamp}."""
+    store = {}
+    for address in addresses:
+        for destination in destinations:
+            key = (destination, address)
+            if key not in store:
+                store[key] = time.time()
+    return store
+
+
+def fill_store(addresses, destinations):
+    """One decode per call, shared by every destination it is recorded for."""
+    store = DedupeStore(capacity=KEYS)
+    for address in addresses:
+        raw = decode_address(address)
+        for destination in destinations:
+            store.add(raw, destination)
+    return store
+
+
+def run(label, fill, addresses, destinations):
+    start = time.perf_counter()
+    fill(addresses, destinations)
+    elapsed = time.perf_counter() - start
+
+    # Memory: the store plus everything it keeps alive, with each CA string
+    # allocated fresh as it would be when parsed from a message
+    tracemalloc.start()
+    fresh = [address.encode().decode() for address in addresses]
+    store = fill(fresh, destinations)
+    del fresh
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+
+    print(
+        f"{label:<26} {elapsed / KEYS * 1e9:6.0f} ns/key  "
+        f"memory={current / 2**20:7.1f} MiB ({current / KEYS:.0f} B/key)"
+    )
+
+
+def main():
+    addresses = [random_address() for _ in range(KEYS // DESTINATIONS)]
+    destinations = [-1001000000000 - i for i in range(DESTINATIONS)]
+    print(f"{KEYS:,} keys: {len(addresses):,} CAs x {DESTINATIONS} destinations")
+
+    run("dict[(dest, str)] = ts", fill_dict, addresses, destinations)
+    run("DedupeStore (scoped bytes)", fill_store, addresses, destinations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Cross-process dedupe under contention: N forwarder processes each see every
+call of the same stream, in their own order, and claim it through the SQLite
+WAL backend. Exactly one process must win each call.
+
+Run from the repository root:
+    python -m benchmarks.bench_dedupe_contention
+"""
+import asyncio
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from forwarder.dedupe import DedupeStore
+from forwarder.dedupe_backends import SQLiteDedupeBackend
+
+CALLS = 5_000
+PROCESSES = (1, 2, 4, 8)
+SCOPE = -1001000000000
+
+
+async def claim_all(path, keys):
+    backend = SQLiteDedupeBackend(path, DedupeStore(capacity=len(keys)))
+    await backend.load()
+    claimed = 0
+    latencies = []
+    for key in keys:
+        start = time.perf_counter()
+        claimed += await backend.claim(key, SCOPE)
+        latencies.append(time.perf_counter() - start)
+    await backend.close()
+    return claimed, latencies
+
+
+def worker(path, keys, seed, barrier, results):
+    random.Random(seed).shuffle(keys)
+    barrier.wait()
+    claimed, latencies = asyncio.run(claim_all(path, keys))
+    results.put((claimed, latencies))
+
+
+def run(processes, keys):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "forwarded_cas.sqlite3")
+        barrier = multiprocessing.Barrier(processes + 1)
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=worker, args=(path, list(keys), seed, barrier, results))
+            for seed in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        barrier.wait()
+        start = time.perf_counter()
+        outcomes = [results.get() for _ in workers]
+        elapsed = time.perf_counter() - start
+        for process in workers:
+            process.join()
+
+    claimed = sum(count for count, _ in outcomes)
+    latencies = sorted(latency for _, worker_latencies in outcomes for latency in worker_latencies)
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{processes} processes  {processes * len(keys) / elapsed:8.0f} claims/s  "
+        f"p50={p50 * 1e6:6.0f} us  p99={p99 * 1e6:7.0f} us  "
+        f"forwarded={claimed} of {len(keys)}{'' if claimed == len(keys) else '  MISMATCH'}"
+    )
+
+
+def main():
+    keys = [os.urandom(32) for _ in range(CALLS)]
+    print(f"{CALLS:,} distinct calls, every process sees all of them ({os.cpu_count()} CPUs)")
+    for processes in PROCESSES:
+        run(processes, keys)
+
+
+if __name__ == "__main__":
+    main()
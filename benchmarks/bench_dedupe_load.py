@@ -0,0 +1,43 @@
+"""
+Warm-start cost: restoring 1M persisted dedupe entries into a DedupeStore.
+
+Documents are generated in memory in the shape the forwarded_cas query
+returns, so this measures the CPU side of startup; the MongoDB transfer of
+the same documents comes on top.
+
+Run from the repository root:
+    python -m benchmarks.bench_dedupe_load
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from forwarder.dedupe import DedupeStore, restore_entries
+
+ENTRIES = 1_000_000
+DESTINATIONS = 10
+
+
+def main():
+    now = datetime.now(timezone.utc)
+    naive_now = now.replace(tzinfo=None)  # pymongo returns naive UTC datetimes
+    window = timedelta(hours=23)
+    keys = [os.urandom(32) for _ in range(ENTRIES // DESTINATIONS)]
+    documents = [
+        {
+            "scope": -1001000000000 - i % DESTINATIONS,
+            "key": keys[i // DESTINATIONS],
+            "created_at": naive_now - window + window * (i / ENTRIES),
+        }
+        for i in range(ENTRIES)
+    ]
+
+    store = DedupeStore(capacity=ENTRIES)
+    start = time.perf_counter()
+    restored = restore_entries(store, documents, now)
+    elapsed = time.perf_counter() - start
+    print(f"restored {restored:,} entries in {elapsed:.2f}s ({elapsed / ENTRIES * 1e6:.2f} us/entry)")
+    print(store.stats())
+
+
+if __name__ == "__main__":
+    main()
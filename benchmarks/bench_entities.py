@@ -0,0 +1,53 @@
+"""
+Extraction from long call messages whose CA sits in a code entity: the
+full-text template plus link scan vs. the entity path, which takes the CA
+from the entity and only runs the small token name and market cap patterns.
+
+Run from the repository root:
+    python -m benchmarks.bench_entities
+"""
+import time
+from types import SimpleNamespace
+from telethon.tl.types import MessageEntityCode
+from forwarder.entities import extract_from_entities
+from forwarder.extraction import assign_group_template, extract_contract
+
+ITERATIONS = 20_000
+GROUP_ID = -1001
+ADDRESS = "7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsU"
+# Typical alpha-group filler around the call: socials, holder stats and disclaimers
+FILLER = "🔗 Socials: https://x.com/moontoken | Holders: 1,234 | Top 10: 18% | DYOR, not financial advice 🚀\n"
+
+
+def make_message(filler_lines):
+    head = "Moon Token | @alphacalls\n💹MC: $123,456.78\n"
+    text = head + FILLER * filler_lines + "CA: "
+    offset = len(text.encode("utf-16-le")) // 2
+    text += ADDRESS + "\n"
+    return SimpleNamespace(message=text, entities=[MessageEntityCode(offset=offset, length=len(ADDRESS))])
+
+
+def run(label, func):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main():
+    assign_group_template(GROUP_ID, "default")
+    for filler_lines in (0, 10, 50):
+        message = make_message(filler_lines)
+        text_call = extract_contract(message.message, GROUP_ID)
+        entity_call = extract_from_entities(message, GROUP_ID)
+        assert text_call == entity_call, (text_call, entity_call)
+        full_text = run("full text", lambda: extract_contract(message.message, GROUP_ID))
+        entities = run("entities", lambda: extract_from_entities(message, GROUP_ID))
+        print(
+            f"{len(message.message):6} chars  full text {full_text:7.2f} µs  "
+            f"entities {entities:7.2f} µs  ({full_text / entities:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Throughput benchmark: per-group call templates vs. the legacy three-regex path.
+
+Run from the repository root:
+    python -m benchmarks.bench_extraction
+"""
+import re
+import time
+from forwarder.extraction import assign_group_template, extract_call, extract_contract_cached, extraction_cache
+
+ITERATIONS = 200_000
+
+DEFAULT_CALL = (
+    "Moon Token | @alphacalls\n"
+    "💹MC: $123,456.78\n"
+    "🔥 Volume: $55,000\n"
+    "CA: 7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsU\n"
+)
+LABELED_CALL = (
+    "🚀 New call\n"
+    "Token: Moon Token\n"
+    "Market Cap: $123,456\n"
+    "Contract: 7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsU\n"
+)
+NOISE = "gm everyone, chart looks good, waiting for the next leg up"
+
+
+def legacy_extract(text):
+    """The pre-template path: three patterns rebuilt and searched per message."""
+    token_pattern = r"^(.*?) \| @"
+    mc_pattern = r"💹MC: \$([\d,]+\.\d+)"
+    ca_pattern = r"CA: ([a-zA-Z0-9]{32,44})"
+    token_match = re.search(token_pattern, text, re.MULTILINE)
+    mc_match = re.search(mc_pattern, text)
+    ca_match = re.search(ca_pattern, text)
+    if not token_match or not mc_match or not ca_match:
+        return None
+    return token_match.group(1).strip(), mc_match.group(1), ca_match.group(1)
+
+
+def run(label, func, messages):
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        func(*messages[i % len(messages)])
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {ITERATIONS / elapsed:>12,.0f} msgs/sec")
+
+
+def main():
+    assign_group_template(-1001, "default")
+    assign_group_template(-1002, "labeled")
+    mix = [(DEFAULT_CALL, -1001), (NOISE, -1001), (LABELED_CALL, -1002)]
+
+    run("legacy three-regex", lambda text, _: legacy_extract(text), mix)
+    run("compiled templates", extract_call, mix)
+    run("cached full pipeline", extract_contract_cached, mix)
+    print(f"extraction cache: {extraction_cache.stats()}")
+
+    found_legacy = sum(legacy_extract(text) is not None for text, _ in mix)
+    found_templates = sum(extract_call(text, group_id) is not None for text, group_id in mix)
+    print(f"calls recognised per mix: legacy={found_legacy} templates={found_templates}")
+
+
+if __name__ == "__main__":
+    main()
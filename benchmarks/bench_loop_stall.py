@@ -0,0 +1,103 @@
+"""
+Event-loop stall under simulated MongoDB latency: the shared repository's
+per-message lookups against a blocking pymongo-style driver vs. the awaited
+Motor driver it now uses. The collections are swapped for in-memory stand-ins
+with a fixed round-trip time, so only how that time is spent differs.
+
+Run from the repository root:
+    python -m benchmarks.bench_loop_stall
+"""
+import asyncio
+import time
+import repository
+
+MONGO_LATENCY = 0.005  # seconds per round trip
+MESSAGES = 200
+TICK = 0.001
+USER_ID = 1
+
+
+class Cursor:
+    def __init__(self, collection, documents):
+        self.collection = collection
+        self.documents = documents
+
+    async def to_list(self, length):
+        await self.collection.round_trip()
+        return list(self.documents)
+
+
+class FakeCollection:
+    """In-memory documents behind a Motor-shaped API; each call is one round trip."""
+    def __init__(self, documents, blocking):
+        self.documents = documents
+        self.blocking = blocking
+
+    async def round_trip(self):
+        if self.blocking:
+            # What a synchronous pymongo call inside a handler does to the loop
+            time.sleep(MONGO_LATENCY)
+        else:
+            await asyncio.sleep(MONGO_LATENCY)
+
+    def _matches(self, query):
+        return [doc for doc in self.documents if all(doc.get(field) == value for field, value in query.items())]
+
+    async def find_one(self, query, projection=None):
+        await self.round_trip()
+        matches = self._matches(query)
+        return matches[0] if matches else None
+
+    def find(self, query, projection=None):
+        return Cursor(self, self._matches(query))
+
+
+def install(blocking):
+    repository.users_collection = FakeCollection([{"_id": USER_ID, "destination_group_id": -100}], blocking)
+    repository.group_configs_collection = FakeCollection(
+        [{"user_id": USER_ID, "group_id": str(-1000 - i), "notifier": "caller"} for i in range(20)], blocking
+    )
+    repository.meta_collection = FakeCollection(
+        [{"_id": repository.CONFIG_VERSION_ID, "version": 1}], blocking
+    )
+
+
+async def handler():
+    # The lookups the forwarder made per message before the config cache
+    await repository.get_user(USER_ID, ["destination_group_id", "trading_bot_id"])
+    await repository.find_group_configs({"user_id": USER_ID})
+    await repository.get_config_version()
+
+
+async def measure_stall(stop):
+    """Record how late a 1ms ticker wakes up while handlers run."""
+    worst = total = 0.0
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK
+        await asyncio.sleep(TICK)
+        lag = max(0.0, time.perf_counter() - expected)
+        worst = max(worst, lag)
+        total += lag
+    return worst, total
+
+
+async def run(label, blocking):
+    install(blocking)
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_stall(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*[handler() for _ in range(MESSAGES)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst, total = await ticker
+    print(f"{label:<10} wall={elapsed * 1000:8.1f}ms  max stall={worst * 1000:7.1f}ms  total stall={total * 1000:8.1f}ms")
+
+
+async def main():
+    print(f"{MESSAGES} messages, 3 repository calls each, {MONGO_LATENCY * 1000:.0f}ms simulated Mongo latency")
+    await run("pymongo", blocking=True)
+    await run("motor", blocking=False)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
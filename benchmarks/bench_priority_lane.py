@@ -0,0 +1,78 @@
+"""
+CA-to-trading-bot latency under a burst of calls: every call is sent to the
+trading bot, the user's DM and the destination group through one Outbox,
+with and without the urgent lane. The account-wide token bucket is the
+bottleneck; per-destination limits are lifted so only the lane differs.
+
+Run from the repository root:
+    python -m benchmarks.bench_priority_lane
+"""
+import asyncio
+import time
+from forwarder.outbox import PRIORITY_NORMAL, PRIORITY_URGENT, Outbox
+
+CALLS = 1000
+ACCOUNT_RATE = 1000  # sends per second for the whole account
+SEND_LATENCY = 0.001  # seconds per send_message round trip
+TRADING_BOT, DM, GROUP = 1, 2, 3
+
+
+class FakeClient:
+    """Records when each message reaches send_message."""
+    def __init__(self):
+        self.sent_at = {}
+
+    async def send_message(self, destination, text, **kwargs):
+        self.sent_at[destination, text] = time.perf_counter()
+        await asyncio.sleep(SEND_LATENCY)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(label, lane):
+    client = FakeClient()
+    outbox = Outbox(
+        client, rate=ACCOUNT_RATE, burst=ACCOUNT_RATE / 40,
+        destination_rate=1e9, destination_burst=1e9,
+    )
+    queued_at = {}
+    for call in range(CALLS):
+        ca = f"CA{call}"
+        queued_at[ca] = time.perf_counter()
+        if lane:
+            autobuy = outbox.enqueue(TRADING_BOT, ca, priority=PRIORITY_URGENT, parse_mode=None)
+        else:
+            autobuy = None
+            outbox.enqueue(TRADING_BOT, ca, priority=PRIORITY_NORMAL, parse_mode=None)
+        for destination in (DM, GROUP):
+            outbox.enqueue(destination, f"notification {ca}", after=autobuy, parse_mode="Markdown")
+    await outbox.drain()
+    await outbox.close()
+
+    bot = [client.sent_at[TRADING_BOT, ca] - queued_at[ca] for ca in queued_at]
+    notifications = [
+        client.sent_at[destination, f"notification {ca}"] - queued_at[ca]
+        for ca in queued_at for destination in (DM, GROUP)
+    ]
+    early = sum(
+        client.sent_at[destination, f"notification {ca}"] < client.sent_at[TRADING_BOT, ca]
+        for ca in queued_at for destination in (DM, GROUP)
+    )
+    print(
+        f"{label:<18} trading bot p50={percentile(bot, 0.5) * 1e3:6.0f} ms  p99={percentile(bot, 0.99) * 1e3:6.0f} ms  "
+        f"notifications p99={percentile(notifications, 0.99) * 1e3:6.0f} ms  "
+        f"notifications before the bot={early}"
+    )
+
+
+async def main():
+    print(f"{CALLS} calls x 3 destinations, account limit {ACCOUNT_RATE}/s, {SEND_LATENCY * 1e3:.0f} ms per send")
+    await run("shared FIFO", lane=False)
+    await run("urgent lane", lane=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
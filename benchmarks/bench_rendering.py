@@ -0,0 +1,62 @@
+"""
+Forward message render-plus-send-prep cost: the old Markdown f-string parsed
+by Telethon on every send vs. the precompiled ForwardTemplate with
+formatting_entities.
+
+Run from the repository root:
+    python -m benchmarks.bench_rendering
+"""
+import time
+from telethon.extensions import markdown
+from forwarder.helpers import round_to_k
+from forwarder.rendering import forward_template
+
+ITERATIONS = 20_000
+NOTIFIER = "Insider Play"
+CA = "7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
+TOKEN = "$POPCAT"
+MC = "1,234,567"
+
+
+def markdown_prep():
+    """The pre-template handler: build Markdown, then Telethon parses it in send_message."""
+    details = f"{TOKEN}\n" + f"MC: {round_to_k(MC)}\n" + "\n"
+    text = (
+        f"{NOTIFIER}\n\n"
+        f"{details}"
+        f"{CA}\n\n"
+        "🤖 Ape Faster, Use bot below:\n"
+        f"[Trojan](https://t.me/helenus_trojanbot?start=r-kaoru9-{CA}) | "
+        f"[Maestro](https://t.me/MaestroSniperBot?start={CA}-kaoru91819) | "
+        f"[Bonk Bot](https://t.me/bonkbot_bot?start=ref_fnhex_ca_{CA}) | "
+        f"[STB](https://t.me/SolTradingBot_Europe_Bot?start={CA}-lUNqcvksz)\n\n"
+    )
+    return markdown.parse(text)
+
+
+def template_prep():
+    """Splice the call into the compiled template; send_message skips parsing."""
+    return forward_template.render(NOTIFIER, CA, TOKEN, MC)
+
+
+def measure(label, prep):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        prep()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<26} {elapsed / ITERATIONS * 1e6:6.1f} us/message")
+
+
+def main():
+    # Both must produce the same message Telegram receives
+    old_text, old_entities = markdown_prep()
+    new_text, new_entities = template_prep()
+    assert old_text == new_text, (old_text, new_text)
+    assert [(e.offset, e.length, e.url) for e in old_entities] == [(e.offset, e.length, e.url) for e in new_entities]
+
+    measure("Markdown parse per send", markdown_prep)
+    measure("ForwardTemplate.render", template_prep)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Telethon session persistence: one background upsert per save() (the old
+MongoSession) vs. the coalescing SessionStore, and one find_one per user vs.
+one bulk load at startup. MongoDB is simulated with a fixed round-trip time
+so only the number and shape of round trips differ.
+
+Run from the repository root:
+    python -m benchmarks.bench_session_writes
+"""
+import asyncio
+import random
+import time
+import mongo_session
+from mongo_session import MongoSession, SessionStore
+
+USERS = 500
+SAVES_PER_USER = 20  # auth key, DC and update-state changes over the run
+DURATION = 2
+ROUND_TRIP = 0.002
+FLUSH_DELAY = 0.5
+
+
+class FakeDatabase:
+    """Counts round trips; each takes ROUND_TRIP seconds and the last write wins."""
+    def __init__(self):
+        self.round_trips = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.sessions = {}
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(ROUND_TRIP)
+        self.in_flight -= 1
+
+    async def save_session(self, user_id, session_data):
+        await self._round_trip()
+        self.sessions[user_id] = session_data
+
+    async def save_sessions(self, sessions):
+        await self._round_trip()
+        self.sessions.update(sessions)
+
+    async def load_session(self, user_id):
+        await self._round_trip()
+        return self.sessions.get(user_id)
+
+    async def load_sessions(self, user_ids):
+        await self._round_trip()
+        return {user_id: self.sessions[user_id] for user_id in user_ids if user_id in self.sessions}
+
+
+class PerSaveSession(MongoSession):
+    """The old behaviour: every save() schedules its own upsert."""
+    def save(self):
+        asyncio.ensure_future(self.store.save_session(self.user_id, self.save_to_string()))
+
+
+async def churn(sessions):
+    # Each session changes SAVES_PER_USER times at random moments over DURATION seconds
+    rng = random.Random(1)
+    schedule = sorted((rng.uniform(0, DURATION), session) for session in sessions for _ in range(SAVES_PER_USER))
+    start = time.perf_counter()
+    for at, session in schedule:
+        delay = at - (time.perf_counter() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        session.set_dc(rng.choice((1, 2, 4)), "149.154.167.51", 443)
+        session.save()
+
+
+async def run_writes(label, coalesced):
+    database = FakeDatabase()
+    mongo_session.save_sessions = database.save_sessions
+    store = SessionStore(FLUSH_DELAY)
+    if coalesced:
+        sessions = [MongoSession(user_id, store=store) for user_id in range(USERS)]
+    else:
+        sessions = [PerSaveSession(user_id, store=database) for user_id in range(USERS)]
+    await churn(sessions)
+    await store.close()
+    # Let any in-flight per-save upserts finish before comparing
+    await asyncio.sleep(ROUND_TRIP * 10)
+    stale = sum(database.sessions.get(session.user_id) != session.save_to_string() for session in sessions)
+    print(
+        f"{label:<22} round trips={database.round_trips:6}  max in flight={database.max_in_flight:5}  "
+        f"stale sessions={stale}"
+    )
+
+
+async def run_loads(label, bulk):
+    database = FakeDatabase()
+    database.sessions = {user_id: MongoSession(user_id).save_to_string() for user_id in range(USERS)}
+    mongo_session.load_session = database.load_session
+    mongo_session.load_sessions = database.load_sessions
+    store = SessionStore()
+    start = time.perf_counter()
+    if bulk:
+        loaded = await store.load_many(range(USERS))
+    else:
+        loaded = {user_id: await store.load(user_id) for user_id in range(USERS)}
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} round trips={database.round_trips:6}  load time={elapsed * 1e3:7.1f} ms  sessions={len(loaded)}")
+
+
+async def main():
+    print(f"{USERS} sessions, {SAVES_PER_USER} save() calls each over {DURATION}s, {ROUND_TRIP * 1e3:.0f} ms per round trip")
+    await run_writes("upsert per save", coalesced=False)
+    await run_writes(f"coalesced ({FLUSH_DELAY}s)", coalesced=True)
+    await run_loads("find_one per user", bulk=False)
+    await run_loads("bulk load", bulk=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
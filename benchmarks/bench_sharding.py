@@ -0,0 +1,78 @@
+"""
+Sharded forwarder throughput: synthetic call events for many users, split
+across 1..N worker processes by the same consistent hash ring the
+supervisor uses. Each worker runs the CPU side of the handler (extraction,
+CA decoding, dedupe and rendering) for its own users.
+
+Run from the repository root:
+    python -m benchmarks.bench_sharding
+"""
+import multiprocessing
+import os
+import time
+from forwarder.dedupe import DedupeStore
+from forwarder.extraction import extract_contract
+from forwarder.rendering import forward_template
+from forwarder.sharding import HashRing
+from forwarder.validation import decode_address
+from benchmarks.bench_dedupe import random_address
+
+USERS = 500
+EVENTS = 50_000
+WORKERS = (1, 2, 4, 8)
+GROUP_ID = -1001000000001
+
+
+def make_event(address):
+    return (
+        "Moon Token | @alphacalls\n"
+        "💹MC: $123,456.78\n"
+        f"CA: {address}\n"
+    )
+
+
+def worker(events, barrier, results):
+    store = DedupeStore(capacity=len(events) + 1)
+    barrier.wait()
+    start = time.perf_counter()
+    for user_id, text in events:
+        call = extract_contract(text, GROUP_ID)
+        if call and store.add(decode_address(call.contract_address), user_id):
+            forward_template.render("Insider Play", call.contract_address, call.token_name, call.market_cap)
+    results.put(time.perf_counter() - start)
+
+
+def run(workers, events):
+    ring = HashRing(workers)
+    shards = [[] for _ in range(workers)]
+    for user_id, text in events:
+        shards[ring.shard_for(user_id)].append((user_id, text))
+
+    barrier = multiprocessing.Barrier(workers + 1)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=worker, args=(shard, barrier, results)) for shard in shards]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    start = time.perf_counter()
+    busiest = max(results.get() for _ in processes)
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+    sizes = sorted(len(shard) for shard in shards)
+    print(
+        f"{workers} worker(s)  {len(events) / elapsed:9.0f} events/s  "
+        f"busiest worker {busiest:5.2f} s  shard sizes {sizes[0]}..{sizes[-1]}"
+    )
+
+
+def main():
+    addresses = [random_address() for _ in range(EVENTS // 4)]
+    events = [(user_id % USERS, make_event(addresses[user_id % len(addresses)])) for user_id in range(EVENTS)]
+    print(f"{EVENTS:,} events from {USERS} users on {os.cpu_count()} CPU(s)")
+    for workers in WORKERS:
+        run(workers, events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Microbenchmark: base58/length validation vs. the regex-only candidate check.
+
+Run from the repository root:
+    python -m benchmarks.bench_validation
+"""
+import re
+import time
+from forwarder.validation import filter_valid_addresses, is_valid_address
+
+ITERATIONS = 200_000
+
+REGEX_ONLY = re.compile(r"^[a-zA-Z0-9]{32,44}$")
+
+CANDIDATES = [
+    "7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsU",  # valid
+    "So11111111111111111111111111111111111111112",  # valid
+    "0xdeadbeefdeadbeefdeadbeefdeadbeefdeadbeef",  # hex hash
+    "IlO0IlO0IlO0IlO0IlO0IlO0IlO0IlO0",  # ambiguous characters
+    "a1b2c3d4e5f6a7b8c9d1e2f3a4b5c6d7",  # random id, decodes too short
+]
+
+
+def run(label, func):
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        func(CANDIDATES[i % len(CANDIDATES)])
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed / ITERATIONS * 1e9:>8.0f} ns/candidate")
+
+
+def main():
+    run("regex only", REGEX_ONLY.match)
+    run("base58 + length", is_valid_address)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS // len(CANDIDATES)):
+        filter_valid_addresses(CANDIDATES)
+    elapsed = time.perf_counter() - start
+    print(f"{'batch per message':<24} {elapsed / (ITERATIONS // len(CANDIDATES)) * 1e9:>8.0f} ns/message")
+
+    accepted_regex = sum(REGEX_ONLY.match(c) is not None for c in CANDIDATES)
+    accepted_valid = len(filter_valid_addresses(CANDIDATES))
+    print(f"accepted of {len(CANDIDATES)}: regex={accepted_regex} validator={accepted_valid}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Index provisioning and query-shape audit for the kaoru database.
+
+Run standalone to create or rebuild indexes and verify every hot query is
+index-backed:
+    python db_indexes.py
+"""
+import sys
+import asyncio
+import logging
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+from repository import (
+    users_collection,
+    group_configs_collection,
+    sessions_collection,
+    forwarded_cas_collection,
+)
+
+# (collection, keys, options) for every index the bots rely on
+REQUIRED_INDEXES = [
+    # Forwarder startup loads only logged-in users
+    (users_collection, [("session_name", ASCENDING)], {"sparse": True}),
+    # Per-user config lookups; unique because the admin bot's group toggles upsert on it. Legacy
+    # per-user documents have neither field, so they are left out instead of colliding on null
+    (
+        group_configs_collection,
+        [("user_id", ASCENDING), ("group_id", ASCENDING)],
+        {"unique": True, "partialFilterExpression": {"user_id": {"$exists": True}}},
+    ),
+    (sessions_collection, [("user_id", ASCENDING)], {"unique": True}),
+    # MongoDB deletes persisted dedupe entries once they expire
+    (forwarded_cas_collection, [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+]
+
+# Server error codes for an existing index with the same keys or name but other options
+INDEX_CONFLICT_CODES = (85, 86)
+# Server error code when existing documents violate a new unique index
+DUPLICATE_KEY_CODE = 11000
+
+# Queries on the hot path that must never fall back to a collection scan
+HOT_QUERIES = [
+    (group_configs_collection, {"user_id": 0}),
+    (group_configs_collection, {"user_id": 0, "group_id": "0"}),
+    (sessions_collection, {"user_id": 0}),
+    # The forwarder bulk-loads a shard's sessions in one query
+    (sessions_collection, {"user_id": {"$in": [0, 1]}}),
+    (users_collection, {"_id": 0}),
+]
+
+
+async def ensure_indexes(rebuild=False):
+    """
+    Create every missing required index.
+
+    At forwarder startup an index whose options changed, or a unique index
+    that existing documents violate, is only reported: several workers start
+    at once and must not drop indexes under each other, and a data problem
+    must not keep the forwarder down. The standalone command passes
+    `rebuild=True` to drop and recreate changed indexes.
+
+    Args:
+        rebuild (bool, optional): Drop and recreate indexes whose options changed.
+
+    Returns:
+        list[str]: Descriptions of indexes that are not in place.
+    """
+    problems = []
+    for collection, keys, options in REQUIRED_INDEXES:
+        try:
+            try:
+                name = await collection.create_index(keys, **options)
+            except OperationFailure as e:
+                if not rebuild or e.code not in INDEX_CONFLICT_CODES:
+                    raise
+                logging.warning(f"Rebuilding index on {collection.name} {keys} with {options}: {e}")
+                await collection.drop_index(keys)
+                name = await collection.create_index(keys, **options)
+        except OperationFailure as e:
+            if e.code == DUPLICATE_KEY_CODE:
+                problem = f"{collection.name} has duplicate {keys} entries; remove them and run python db_indexes.py"
+            elif e.code in INDEX_CONFLICT_CODES:
+                problem = f"Index on {collection.name} {keys} has outdated options; run python db_indexes.py"
+            else:
+                raise
+            logging.warning(f"{problem}: {e}")
+            problems.append(problem)
+            continue
+        logging.info(f"Index {collection.name}.{name} is in place.")
+    return problems
+
+
+def _plan_stages(plan):
+    """
+    Yield every stage name in an explain plan tree.
+    """
+    yield plan.get("stage")
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    # Newer servers wrap the classic plan in queryPlan
+    if "queryPlan" in plan:
+        yield from _plan_stages(plan["queryPlan"])
+
+
+async def audit_query_shapes(queries=HOT_QUERIES):
+    """
+    Explain each hot query and report the ones that scan the whole collection.
+
+    Args:
+        queries (list, optional): (collection, filter) pairs to explain. Defaults to HOT_QUERIES.
+
+    Returns:
+        list[str]: Descriptions of unindexed queries; empty when every query uses an index.
+    """
+    failures = []
+    for collection, query in queries:
+        explain = await collection.find(query).explain()
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in set(_plan_stages(winning_plan)):
+            failures.append(f"{collection.name}.find({query}) uses a collection scan")
+    return failures
+
+
+async def main():
+    failures = await ensure_indexes(rebuild=True)
+    failures += await audit_query_shapes()
+    for failure in failures:
+        logging.error(failure)
+    if failures:
+        sys.exit(1)
+    logging.info("All hot queries are index-backed.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+import math
+
+_MASK64 = (1 << 64) - 1
+
+# Mixes the scope into the key hash (64-bit golden ratio constant)
+_SCOPE_MIX = 0x9E3779B97F4A7C15
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over (scope, decoded address) pairs.
+
+    Decoded Solana addresses are ed25519 public keys and already uniformly
+    distributed, so their first 16 bytes serve as the two base hashes for
+    double hashing instead of running a hash function per lookup.
+    """
+    __slots__ = ("capacity", "fp_rate", "size", "hashes", "count", "bits")
+
+    def __init__(self, capacity, fp_rate):
+        """
+        Args:
+            capacity (int): Expected number of items.
+            fp_rate (float): Target false-positive rate at capacity, e.g. 0.001.
+        """
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.size = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _hashes(self, key, scope):
+        h1 = int.from_bytes(key[:8], "little") ^ ((scope * _SCOPE_MIX) & _MASK64)
+        h2 = int.from_bytes(key[8:16], "little") | 1
+        return h1, h2
+
+    def add(self, key, scope=0):
+        """
+        Add a (scope, key) pair.
+
+        Args:
+            key (bytes): The decoded contract address.
+            scope (int, optional): The dedupe scope ID.
+        """
+        h1, h2 = self._hashes(key, scope)
+        bits, size = self.bits, self.size
+        for _ in range(self.hashes):
+            position = h1 % size
+            bits[position >> 3] |= 1 << (position & 7)
+            h1 += h2
+        self.count += 1
+
+    def might_contain(self, key, scope=0):
+        """
+        Check a (scope, key) pair; False means definitely never added.
+
+        Positions are computed lazily, so an absent pair usually costs only
+        one or two probes.
+
+        Args:
+            key (bytes): The decoded contract address.
+            scope (int, optional): The dedupe scope ID.
+
+        Returns:
+            bool: True if the pair may have been added.
+        """
+        h1, h2 = self._hashes(key, scope)
+        bits, size = self.bits, self.size
+        for _ in range(self.hashes):
+            position = h1 % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            h1 += h2
+        return True
+
+    def estimated_fp_rate(self):
+        """
+        Estimate the current false-positive rate from the number of items added.
+
+        Returns:
+            float: Probability a never-added pair is reported as present.
+        """
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+
+class RotatingBloomFilter:
+    """
+    Pair of Bloom filters rotated every `ttl` seconds: new items go into the
+    current filter and lookups check both, so an item is reported for at least
+    `ttl` and at most twice that, and memory never grows.
+    """
+
+    def __init__(self, ttl, capacity, fp_rate, clock):
+        """
+        Args:
+            ttl (float): Minimum seconds an item is remembered.
+            capacity (int): Expected items per rotation period.
+            fp_rate (float): Target false-positive rate per filter at capacity.
+            clock (Callable[[], float]): Time source shared with the exact store.
+        """
+        self.ttl = ttl
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.clock = clock
+        self.rotations = 0
+        self.current = BloomFilter(capacity, fp_rate)
+        self.previous = BloomFilter(capacity, fp_rate)
+        self._rotated_at = clock()
+
+    def _rotate_if_due(self):
+        if self.clock() - self._rotated_at >= self.ttl:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.fp_rate)
+            self._rotated_at = self.clock()
+            self.rotations += 1
+
+    def add(self, key, scope=0):
+        """
+        Add a (scope, key) pair to the current filter.
+        """
+        self._rotate_if_due()
+        self.current.add(key, scope)
+
+    def might_contain(self, key, scope=0):
+        """
+        Check a (scope, key) pair in both filters; False means definitely absent.
+        """
+        self._rotate_if_due()
+        return self.current.might_contain(key, scope) or self.previous.might_contain(key, scope)
+
+    def stats(self):
+        """
+        Report memory and accuracy of the filter pair.
+
+        Returns:
+            dict: Bit count, hash count, memory in bytes, items and estimated false-positive rate.
+        """
+        current_fp = self.current.estimated_fp_rate()
+        previous_fp = self.previous.estimated_fp_rate()
+        return {
+            "bits": self.current.size,
+            "hashes": self.current.hashes,
+            "bytes": len(self.current.bits) + len(self.previous.bits),
+            "items": self.current.count + self.previous.count,
+            "target_fp_rate": self.fp_rate,
+            "estimated_fp_rate": 1 - (1 - current_fp) * (1 - previous_fp),
+            "rotations": self.rotations,
+        }
@@ -1,34 +1,117 @@
-from .db import db
+from repository import find_group_configs, find_users, get_config_version
+from .constants import CONFIG_POLL_INTERVAL
+from .extraction import assign_group_template
+from .routing import RoutingIndex
+import asyncio
 import logging
 
-# Load MongoDB collections
-users_collection = db["users"]
-group_configs_collection = db["group_configs"]
 
-def get_user_settings(user_id, fields=None):
+def is_routable(group):
     """
-    Fetch user-specific settings saved by the admin bot.
+    Check that a group config names its user and source group.
+
+    Documents written by the legacy admin bot (keyed by user, with
+    source_group_ids) have neither field and are skipped.
 
     Args:
-        user_id (str): The ID of the user to fetch settings for.
-        fields (list, optional): Specific fields to fetch for optimization. Defaults to None.
+        group (dict): A group_configs document.
 
     Returns:
-        dict: The user's settings.
-
-    Raises:
-        ValueError: If no configuration is found for the user.
+        bool: True if the document can be routed.
     """
     try:
-        query = {"_id": user_id}
-        projection = {field: 1 for field in fields} if fields else None
-        user = users_collection.find_one(query, projection)
-
-        if not user:
-            raise ValueError(f"No configuration found for user ID: {user_id}")
-        
-        logging.info(f"User settings fetched successfully for user ID: {user_id}")
-        return user
-    except Exception as e:
-        logging.error(f"Error fetching user settings for user ID: {user_id} - {e}")
-        raise
+        group["user_id"], int(group["group_id"])
+    except (KeyError, TypeError, ValueError):
+        logging.warning(f"Skipping malformed group config {group.get('_id')!r}.")
+        return False
+    return True
+
+
+class ConfigCache:
+    """
+    Process-local copy of every user's group configuration.
+
+    Loaded once at startup and reloaded only when the config version document
+    written by the admin bot changes, so per-message lookups never touch MongoDB.
+    """
+
+    def __init__(self):
+        # A fresh sentinel never equals a published version, so the first refresh loads
+        self.version = object()
+        self.routing = RoutingIndex()
+        # Predicate on user IDs set by a sharded worker; None loads every user
+        self.owns = None
+        self._listeners = []
+
+    async def load(self):
+        """
+        Read group configs and user destinations, for owned users only when
+        sharded, and rebuild the routing index.
+        """
+        fields = ["destination_group_id", "trading_bot_id", "forward_to"]
+        if self.owns is None:
+            groups, users = await asyncio.gather(
+                find_group_configs({"user_id": {"$exists": True}}), find_users(fields=fields)
+            )
+        else:
+            users = [user for user in await find_users(fields=fields) if self.owns(user["_id"])]
+            groups = await find_group_configs({"user_id": {"$in": [user["_id"] for user in users]}})
+        groups = [group for group in groups if is_routable(group)]
+        for group in groups:
+            if "template" in group:
+                assign_group_template(group["group_id"], group["template"])
+        self.routing.build(groups, users)
+        for listener in list(self._listeners):
+            listener()
+        logging.info(f"Loaded {len(groups)} group configs for {len(users)} users (version {self.version}).")
+
+    async def refresh(self):
+        """
+        Reload the cache if the published version changed.
+
+        Returns:
+            bool: True if the cache was reloaded.
+        """
+        version = await get_config_version()
+        if version == self.version:
+            return False
+        self.version = version
+        await self.load()
+        return True
+
+    def add_listener(self, callback):
+        """
+        Register a callback run after every reload.
+
+        Args:
+            callback (Callable[[], None]): Called with no arguments once the routing index is rebuilt.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """
+        Unregister a reload callback.
+
+        Args:
+            callback (Callable[[], None]): A callback passed to add_listener.
+        """
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    async def poll(self, interval=CONFIG_POLL_INTERVAL):
+        """
+        Periodically check the config version and reload on change.
+
+        Args:
+            interval (float, optional): Seconds between version checks.
+        """
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logging.error(f"Error refreshing config cache: {e}")
+            await asyncio.sleep(interval)
+
+
+# Shared by every user client in the process
+config_cache = ConfigCache()
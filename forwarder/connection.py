@@ -0,0 +1,150 @@
+import time
+import random
+import asyncio
+import logging
+from .constants import CLIENT_RECONNECT_BACKOFF, CLIENT_RECONNECT_BACKOFF_MAX, CLIENT_STALL_TIMEOUT, CLIENT_START_TIMEOUT
+from .startup import connect_client
+
+# Connection states reported by ClientHealth
+STATE_CONNECTED = "connected"
+STATE_RECONNECTING = "reconnecting"
+STATE_BACKOFF = "backoff"
+STATE_STOPPED = "stopped"
+
+# ClientHealth of every supervised client, by user ID
+client_health = {}
+
+
+class ClientHealth:
+    """
+    Connection state of one user's client, as seen by its supervisor.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.state = STATE_RECONNECTING
+        self.since = clock()
+        self.last_update = clock()
+        self.reconnects = 0
+        self.stalls = 0
+        self.last_error = None
+
+    def set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.since = self.clock()
+
+    def as_dict(self):
+        """
+        Summarize the health for the stats endpoints.
+
+        Returns:
+            dict: state, seconds in that state, seconds since the last update,
+                reconnect and stall counts and the last error.
+        """
+        now = self.clock()
+        return {
+            "state": self.state,
+            "state_seconds": round(now - self.since, 1),
+            "idle_seconds": round(now - self.last_update, 1),
+            "reconnects": self.reconnects,
+            "stalls": self.stalls,
+            "last_error": self.last_error,
+        }
+
+
+class ConnectionSupervisor:
+    """
+    Keeps one connected client connected.
+
+    Waits on the client's disconnection and reconnects with jittered
+    exponential backoff. A watchdog also treats a client that received no
+    update for `stall_timeout` seconds as stalled and forces a reconnect,
+    since a half-open connection never reports a disconnect. Telethon fetches
+    the missed updates after reconnecting.
+    """
+
+    def __init__(
+        self,
+        client,
+        user_id,
+        stall_timeout=CLIENT_STALL_TIMEOUT,
+        backoff=CLIENT_RECONNECT_BACKOFF,
+        backoff_max=CLIENT_RECONNECT_BACKOFF_MAX,
+        connect_timeout=CLIENT_START_TIMEOUT,
+        clock=time.monotonic,
+        rng=random.random,
+    ):
+        """
+        Args:
+            client (telethon.TelegramClient): An already connected and authorized client.
+            user_id (int): The client's Telegram user ID, for logs.
+            stall_timeout (float, optional): Seconds without updates before forcing a reconnect.
+            backoff (float, optional): First delay before reconnecting.
+            backoff_max (float, optional): Longest reconnect delay; a connection that stayed up
+                this long is considered healthy again.
+            connect_timeout (float, optional): Seconds each reconnection attempt may take.
+            clock (Callable[[], float], optional): Monotonic time source.
+            rng (Callable[[], float], optional): Random source in [0, 1) for the jitter.
+        """
+        self.client = client
+        self.user_id = user_id
+        self.stall_timeout = stall_timeout
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.connect_timeout = connect_timeout
+        self.clock = clock
+        self.rng = rng
+        self.health = ClientHealth(clock)
+
+    async def touch(self, _update=None):
+        """
+        Record that an update arrived. Registered as a raw event handler, which
+        Telethon awaits, so this must be a coroutine.
+        """
+        self.health.last_update = self.clock()
+
+    def _jitter(self, delay):
+        # Half fixed, half random, so clients dropped together do not reconnect in lockstep
+        return delay * (0.5 + self.rng() / 2)
+
+    async def _watch(self):
+        disconnected = self.client.disconnected
+        while True:
+            remaining = self.stall_timeout - (self.clock() - self.health.last_update)
+            if remaining <= 0:
+                self.health.stalls += 1
+                return f"no updates for {self.stall_timeout}s"
+            done, _ = await asyncio.wait({disconnected}, timeout=remaining)
+            if done:
+                error = disconnected.exception()
+                return f"disconnected: {error}" if error else "disconnected"
+
+    async def run(self):
+        """
+        Supervise the client until cancelled.
+        """
+        delay = self.backoff
+        while True:
+            self.health.set_state(STATE_CONNECTED)
+            self.health.last_update = self.clock()
+            connected_at = self.clock()
+            reason = await self._watch()
+            if self.clock() - connected_at >= self.backoff_max:
+                delay = self.backoff
+            self.health.last_error = reason
+            logging.warning(f"Client of user {self.user_id} lost: {reason}; reconnecting.")
+            await self.client.disconnect()
+
+            while True:
+                self.health.set_state(STATE_BACKOFF)
+                await asyncio.sleep(self._jitter(delay))
+                delay = min(delay * 2, self.backoff_max)
+                self.health.set_state(STATE_RECONNECTING)
+                error = await connect_client(self.client, self.connect_timeout)
+                if error is None:
+                    break
+                self.health.last_error = error
+                logging.warning(f"Reconnecting user {self.user_id} failed: {error}.")
+            self.health.reconnects += 1
+            logging.info(f"Client of user {self.user_id} reconnected.")
@@ -1,5 +1,86 @@
-# Solana address regex pattern
-SOLANA_ADDRESS_PATTERN = r'\b[a-zA-Z0-9]{32,44}\b'
+# Solana address regex pattern (base58 alphabet: no 0, O, I or l)
+SOLANA_ADDRESS_PATTERN = r'[1-9A-HJ-NP-Za-km-z]{32,44}'
 
-# Time threshold for cleaning up forwarded contract addresses (24 hours in seconds)
+# How long a forwarded contract address is remembered (24 hours in seconds)
 TIME_THRESHOLD = 86400
+
+# Hard cap on remembered contract addresses; the oldest are evicted first
+DEDUPE_CAPACITY = 1_000_000
+
+# Number of time buckets the dedupe TTL is split into (expiry granularity)
+DEDUPE_BUCKETS = 24
+
+# Optional rotating Bloom filter pair in front of the dedupe store. Off: the store's index lookup is
+# already O(1), and the filter costs ~2 us per lookup and ~3.4 MiB per million keys on top of it
+DEDUPE_BLOOM = False
+DEDUPE_BLOOM_FP_RATE = 0.001
+
+# Dedupe persistence: seconds between write-behind flushes and max writes per batch
+DEDUPE_FLUSH_INTERVAL = 2
+DEDUPE_FLUSH_BATCH = 1000
+
+# Dedupe backend: "local" (this process only), "sqlite" (processes on one host) or "mongo" (any host)
+DEDUPE_BACKEND = "local"
+DEDUPE_SQLITE_PATH = "forwarded_cas.sqlite3"
+# Seconds between deletions of expired rows from the SQLite backend
+DEDUPE_PURGE_INTERVAL = 60
+
+# Who a contract address is deduplicated for: "global", "user" or "destination"
+DEDUPE_SCOPE = "destination"
+
+# Extraction cache bounds: reposts of the same call are usually seconds apart
+EXTRACTION_CACHE_SIZE = 4096
+EXTRACTION_CACHE_TTL = 300
+
+# Where each call is delivered unless a user sets forward_to: their DM, destination group and trading bot
+FORWARD_TO = ("dm", "group", "trading_bot")
+
+# Referral bots linked under every forward: (label, URL with {ca} where the contract address goes)
+REFERRAL_HEADER = "🤖 Ape Faster, Use bot below:"
+REFERRAL_BOTS = (
+    ("Trojan", "https://t.me/helenus_trojanbot?start=r-kaoru9-{ca}"),
+    ("Maestro", "https://t.me/MaestroSniperBot?start={ca}-kaoru91819"),
+    ("Bonk Bot", "https://t.me/bonkbot_bot?start=ref_fnhex_ca_{ca}"),
+    ("STB", "https://t.me/SolTradingBot_Europe_Bot?start={ca}-lUNqcvksz"),
+)
+
+# Seconds between config version checks (the admin bot bumps it on every config write)
+CONFIG_POLL_INTERVAL = 5
+
+# Outbound sends: messages per second and burst size for the whole account and per destination chat
+SEND_RATE_GLOBAL = 25
+SEND_BURST_GLOBAL = 25
+SEND_RATE_PER_DESTINATION = 1
+SEND_BURST_PER_DESTINATION = 5
+# Retries per message (FloodWait or other errors) before it is dropped, and the delay for non-FloodWait errors
+SEND_MAX_RETRIES = 3
+SEND_RETRY_DELAY = 2
+# Concurrent sends to a trading bot, so autobuy CAs in a burst do not wait on each other's round trips
+SEND_URGENT_WORKERS = 4
+
+# Client startup: concurrent connection attempts and seconds each may take before the account is skipped
+CLIENT_START_CONCURRENCY = 20
+CLIENT_START_TIMEOUT = 30
+
+# Seconds before retrying a client that failed to start, doubling per failure up to the maximum
+CLIENT_RETRY_BACKOFF = 30
+CLIENT_RETRY_BACKOFF_MAX = 900
+
+# Connection supervision: seconds without any update before a client is treated as stalled and reconnected
+# (quiet accounts just reconnect once per window), and reconnect backoff bounds in seconds
+CLIENT_STALL_TIMEOUT = 600
+CLIENT_RECONNECT_BACKOFF = 1
+CLIENT_RECONNECT_BACKOFF_MAX = 120
+
+# Local HTTP endpoint serving /metrics (Prometheus) and /stats (JSON for the admin bot's /stats command);
+# sharded worker N listens on STATS_PORT + N
+STATS_HOST = "127.0.0.1"
+STATS_PORT = 9108
+
+# Sharded mode: default worker count, ring points per shard, restart backoff bounds for crashed workers
+# and seconds a worker gets to shut down after SIGTERM before it is killed
+SHARD_WORKERS = 4
+SHARD_RING_REPLICAS = 100
+SHARD_RESTART_BACKOFF = 1
+SHARD_RESTART_BACKOFF_MAX = 60
+SHARD_STOP_TIMEOUT = 15
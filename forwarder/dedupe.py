@@ -0,0 +1,238 @@
+import sys
+import time
+from collections import Counter, deque
+from datetime import timezone
+from .bloom import RotatingBloomFilter
+from .constants import (
+    DEDUPE_BLOOM,
+    DEDUPE_BLOOM_FP_RATE,
+    DEDUPE_BUCKETS,
+    DEDUPE_CAPACITY,
+    DEDUPE_SCOPE,
+    TIME_THRESHOLD,
+)
+
+SCOPE_GLOBAL = "global"
+SCOPE_USER = "user"
+SCOPE_DESTINATION = "destination"
+
+
+def scope_id(subscriber, destination, scope=DEDUPE_SCOPE):
+    """
+    Pick the integer a subscriber's dedupe keys are scoped to for one destination.
+
+    Args:
+        subscriber (forwarder.routing.Subscriber): The routed subscriber.
+        destination (forwarder.routing.Destination): The chat the call is delivered to.
+        scope (str, optional): SCOPE_GLOBAL, SCOPE_USER or SCOPE_DESTINATION.
+
+    Returns:
+        int: 0 for global scope, otherwise the user or destination chat ID.
+    """
+    if scope == SCOPE_DESTINATION:
+        return destination.chat_id
+    if scope == SCOPE_USER:
+        return subscriber.user_id
+    return 0
+
+
+class _Bucket:
+    """
+    One time slice of the dedupe ring: the (scope, key) entries inserted during it.
+    """
+    __slots__ = ("start", "entries")
+
+    def __init__(self, start):
+        self.start = start
+        self.entries = deque()
+
+
+class DedupeStore:
+    """
+    Expiring, scoped set of forwarded contract addresses.
+
+    Membership is one dict lookup on (scope, key), where scope is 0 for
+    global, a user ID or a destination chat ID. The index maps each entry to
+    the time bucket it was inserted in; the ring of buckets only serves
+    expiry, which drops a whole bucket once it is older than the TTL, so
+    expiry is amortized O(1) and entries carry no per-key timestamp. Keys
+    are the 32 decoded address bytes; the bytes object of a call is shared
+    by every scope it is recorded in.
+    """
+
+    def __init__(
+        self,
+        ttl=TIME_THRESHOLD,
+        capacity=DEDUPE_CAPACITY,
+        buckets=DEDUPE_BUCKETS,
+        clock=time.monotonic,
+        bloom_fp_rate=None,
+    ):
+        """
+        Args:
+            ttl (float, optional): Seconds a key is remembered, to within one bucket width.
+            capacity (int, optional): Maximum number of remembered keys; the oldest entries are dropped when exceeded.
+            buckets (int, optional): Number of time buckets the TTL is split into.
+            clock (Callable[[], float], optional): Time source, monotonic by default.
+            bloom_fp_rate (float, optional): Put a rotating Bloom filter pair with this
+                false-positive rate in front of the index. It only adds lookup cost and
+                memory next to the exact index, so it is off unless DEDUPE_BLOOM is set.
+                Defaults to None (no filter).
+        """
+        self.ttl = ttl
+        self.capacity = capacity
+        self.width = ttl / buckets
+        self.clock = clock
+        self.bloom = None
+        if bloom_fp_rate:
+            # Rotate no faster than the slowest bucket expires, so a stored key is never missed
+            self.bloom = RotatingBloomFilter(ttl + self.width, capacity, bloom_fp_rate, clock)
+        self.expired = 0
+        self.evicted = 0
+        self._buckets = deque()
+        self._index = {}
+        self._scopes = Counter()
+
+    def __len__(self):
+        return len(self._index)
+
+    def contains(self, key, scope=0):
+        """
+        Check whether a key was recorded in a scope and has not expired.
+
+        Args:
+            key (bytes): The decoded contract address.
+            scope (int, optional): A value from scope_id. Defaults to global.
+
+        Returns:
+            bool: True if the key is known in the scope.
+        """
+        if self.bloom is not None and not self.bloom.might_contain(key, scope):
+            return False
+        self._expire(self.clock())
+        return (scope, key) in self._index
+
+    def add(self, key, scope=0, at=None):
+        """
+        Remember a key in a scope unless it is already known there.
+
+        Args:
+            key (bytes): The decoded contract address.
+            scope (int, optional): A value from scope_id. Defaults to global.
+            at (float, optional): Clock time the key was first seen, when restoring
+                older entries in ascending order. Defaults to now.
+
+        Returns:
+            bool: True if the key is new and now tracked, False if it was already tracked.
+        """
+        if self.contains(key, scope):
+            return False
+        self._insert(key, scope, self.clock() if at is None else at)
+        return True
+
+    def _insert(self, key, scope, now):
+        if self.bloom is not None:
+            self.bloom.add(key, scope)
+        buckets = self._buckets
+        if not buckets or now - buckets[-1].start >= self.width:
+            buckets.append(_Bucket(now))
+        bucket = buckets[-1]
+        entry = (scope, key)
+        if self._index.get(entry) is None:
+            self._scopes[scope] += 1
+        self._index[entry] = bucket
+        bucket.entries.append(entry)
+
+        if len(self._index) > self.capacity:
+            self._evict()
+
+    def _evict(self):
+        # Drop single entries, oldest first, so the cap holds even within one bucket
+        buckets = self._buckets
+        index = self._index
+        scopes = self._scopes
+        while len(index) > self.capacity:
+            bucket = buckets[0]
+            if not bucket.entries:
+                buckets.popleft()
+                continue
+            entry = bucket.entries.popleft()
+            if index.get(entry) is bucket:
+                del index[entry]
+                scopes[entry[0]] -= 1
+                if not scopes[entry[0]]:
+                    del scopes[entry[0]]
+                self.evicted += 1
+
+    def _drop_oldest(self):
+        bucket = self._buckets.popleft()
+        index = self._index
+        scopes = self._scopes
+        dropped = 0
+        for entry in bucket.entries:
+            # An entry re-inserted into a newer bucket stays
+            if index.get(entry) is bucket:
+                del index[entry]
+                scopes[entry[0]] -= 1
+                if not scopes[entry[0]]:
+                    del scopes[entry[0]]
+                dropped += 1
+        return dropped
+
+    def _expire(self, now):
+        buckets = self._buckets
+        cutoff = now - self.ttl - self.width
+        while buckets and buckets[0].start <= cutoff:
+            self.expired += self._drop_oldest()
+
+    def stats(self):
+        """
+        Report size and churn of the store.
+
+        Returns:
+            dict: Entry count, capacity, bucket and scope counts, expired/evicted
+                totals and approximate memory in bytes.
+        """
+        size = len(self._index)
+        container_bytes = sys.getsizeof(self._index) + sys.getsizeof(self._buckets)
+        container_bytes += sum(sys.getsizeof(bucket.entries) for bucket in self._buckets)
+        return {
+            "entries": size,
+            "capacity": self.capacity,
+            "buckets": len(self._buckets),
+            "scopes": len(self._scopes),
+            "expired": self.expired,
+            "evicted": self.evicted,
+            # Upper bound: assumes no key bytes are shared between scopes
+            "approx_bytes": container_bytes + size * (sys.getsizeof((0, b"")) + sys.getsizeof(bytes(32))),
+            "bloom": self.bloom.stats() if self.bloom is not None else None,
+        }
+
+
+def restore_entries(store, documents, now):
+    """
+    Insert persisted entries into an empty store at startup, keeping their
+    original age. Entries are unique per (scope, key) in MongoDB, so the
+    per-entry membership check is skipped.
+
+    Args:
+        store (forwarder.dedupe.DedupeStore): The store to fill.
+        documents (Iterable[dict]): Entries with scope, key and created_at (UTC), oldest first.
+        now (datetime.datetime): The current UTC time.
+
+    Returns:
+        int: Number of entries restored.
+    """
+    # Shift UTC epoch seconds onto the store's clock
+    offset = store.clock() - now.timestamp()
+    store._expire(store.clock())
+    restored = 0
+    for document in documents:
+        created_at = document["created_at"].replace(tzinfo=timezone.utc).timestamp()
+        store._insert(bytes(document["key"]), document["scope"], created_at + offset)
+        restored += 1
+    return restored
+
+
+# Contract addresses already forwarded by this process
+forwarded_cas = DedupeStore(bloom_fp_rate=DEDUPE_BLOOM_FP_RATE if DEDUPE_BLOOM else None)
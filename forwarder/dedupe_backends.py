@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from .constants import DEDUPE_PURGE_INTERVAL, TIME_THRESHOLD
+
+BACKEND_LOCAL = "local"
+BACKEND_SQLITE = "sqlite"
+BACKEND_MONGO = "mongo"
+
+
+class DedupeBackend(ABC):
+    """
+    Decides whether a (scope, contract address) pair is forwarded.
+
+    `claim` is an atomic insert-if-absent: when several forwarder processes
+    see the same call, exactly one of them gets True within the TTL.
+    """
+
+    async def load(self):
+        """
+        Prepare the backend before clients start.
+
+        Returns:
+            int: Number of entries restored into memory, if any.
+        """
+        return 0
+
+    @abstractmethod
+    async def claim(self, key, scope):
+        """
+        Record a pair unless it is already known.
+
+        Args:
+            key (bytes): The decoded contract address.
+            scope (int): The dedupe scope ID.
+
+        Returns:
+            bool: True if the caller should forward, False for a duplicate.
+        """
+
+    async def run(self):
+        """
+        Background maintenance for the lifetime of the forwarder.
+        """
+
+    async def close(self):
+        """
+        Write out anything still buffered on shutdown.
+        """
+
+
+class LocalDedupeBackend(DedupeBackend):
+    """
+    Single-process dedupe: the in-memory store decides and the persister
+    saves its state for warm restarts. Not shared between processes.
+    """
+
+    def __init__(self, store, persister):
+        """
+        Args:
+            store (forwarder.dedupe.DedupeStore): The in-memory store.
+            persister (forwarder.persistence.DedupePersister): Write-behind persistence for the store.
+        """
+        self.store = store
+        self.persister = persister
+
+    async def load(self):
+        return await self.persister.load()
+
+    async def claim(self, key, scope):
+        if not self.store.add(key, scope):
+            return False
+        # Persisted in the background so restarts do not re-forward it
+        self.persister.record(key, scope)
+        return True
+
+    async def run(self):
+        await self.persister.run()
+
+    async def close(self):
+        await self.persister.flush()
+
+
+class SharedDedupeBackend(DedupeBackend):
+    """
+    Dedupe shared between forwarder processes, with the local store in front
+    of the shared state so repeats are answered without a round trip.
+    """
+
+    def __init__(self, store):
+        """
+        Args:
+            store (forwarder.dedupe.DedupeStore): Local store in front of the shared state.
+        """
+        self.store = store
+        self.claimed = 0
+        self.rejected = 0
+
+    async def claim(self, key, scope):
+        # Another process may claim a pair first, but never un-claims it, so a local hit is final
+        if self.store.contains(key, scope):
+            self.rejected += 1
+            return False
+        claimed = await self._claim_remote(key, scope)
+        self.store.add(key, scope)
+        if claimed:
+            self.claimed += 1
+        else:
+            self.rejected += 1
+        return claimed
+
+    @abstractmethod
+    async def _claim_remote(self, key, scope):
+        """
+        Atomically insert the pair into the shared state unless a live copy exists.
+
+        Args:
+            key (bytes): The decoded contract address.
+            scope (int): The dedupe scope ID.
+
+        Returns:
+            bool: True if this process claimed the pair.
+        """
+
+
+class SQLiteDedupeBackend(SharedDedupeBackend):
+    """
+    Dedupe shared by every forwarder process on one host through a SQLite
+    file in WAL mode.
+
+    The insert-if-absent is a single upsert that only overwrites an expired
+    row, so SQLite's write lock makes it atomic across processes. Queries run
+    on a dedicated thread to keep lock waits off the event loop, and the
+    local store answers repeats without touching the file.
+    """
+
+    def __init__(self, path, store, ttl=TIME_THRESHOLD, purge_interval=DEDUPE_PURGE_INTERVAL, clock=time.time):
+        """
+        Args:
+            path (str): Path of the SQLite database file.
+            store (forwarder.dedupe.DedupeStore): Local store in front of the file.
+            ttl (float, optional): Seconds a pair is remembered.
+            purge_interval (float, optional): Seconds between deletions of expired rows.
+            clock (Callable[[], float], optional): Wall-clock time source shared by all processes.
+        """
+        super().__init__(store)
+        self.path = path
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dedupe-sqlite")
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            # Autocommit; the executor thread is the only user of the connection
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS forwarded_cas ("
+                "scope INTEGER NOT NULL, key BLOB NOT NULL, expires_at REAL NOT NULL, "
+                "PRIMARY KEY (scope, key)) WITHOUT ROWID"
+            )
+            self._connection = connection
+        return self._connection
+
+    def claim_sync(self, key, scope):
+        """
+        Blocking insert-if-absent; see `claim`.
+
+        Args:
+            key (bytes): The decoded contract address.
+            scope (int): The dedupe scope ID.
+
+        Returns:
+            bool: True if this call inserted the pair or took over an expired one.
+        """
+        now = self.clock()
+        cursor = self._connect().execute(
+            "INSERT INTO forwarded_cas (scope, key, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (scope, key) DO UPDATE SET expires_at = excluded.expires_at "
+            "WHERE forwarded_cas.expires_at <= ?",
+            (scope, key, now + self.ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    def purge_sync(self):
+        """
+        Delete expired rows.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        cursor = self._connect().execute("DELETE FROM forwarded_cas WHERE expires_at <= ?", (self.clock(),))
+        return cursor.rowcount
+
+    async def _call(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def load(self):
+        # Create the file and table up front so the first call pays no setup cost
+        await self._call(self._connect)
+        return 0
+
+    async def _claim_remote(self, key, scope):
+        return await self._call(self.claim_sync, key, scope)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.purge_interval)
+            try:
+                await self._call(self.purge_sync)
+            except sqlite3.Error as e:
+                # A locked or busy file only delays the purge; expired rows are still overwritten on claim
+                logging.error(f"Error purging expired forwarded CAs from {self.path}: {e}")
+
+    async def close(self):
+        if self._connection is not None:
+            await self._call(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,97 @@
+from telethon.tl.types import (
+    MessageEntityCode,
+    MessageEntityPre,
+    MessageEntityTextUrl,
+    MessageEntityUrl,
+)
+from .extraction import CACHE_MISS, extract_contract, extract_contract_cached, extraction_cache, template_for_group
+from .scanner import scan_links
+from .validation import filter_valid_addresses
+
+# Entities whose visible text may hold a CA or a token link
+TEXT_ENTITIES = (MessageEntityCode, MessageEntityPre, MessageEntityUrl)
+
+
+def entity_addresses(message):
+    """
+    Collect contract addresses from a message's code spans, URLs and hidden text URLs.
+
+    Args:
+        message (telethon.tl.custom.message.Message): The incoming message.
+
+    Returns:
+        list[str]: Valid, unique addresses in entity order; empty if no entity holds one.
+    """
+    entities = message.entities
+    if not entities:
+        return []
+
+    # Entity offsets count UTF-16 code units, so slice the encoded text
+    encoded = None
+    candidates = []
+    for entity in entities:
+        if isinstance(entity, MessageEntityTextUrl):
+            fragment = entity.url
+        elif isinstance(entity, TEXT_ENTITIES):
+            if encoded is None:
+                encoded = (message.message or "").encode("utf-16-le")
+            start = entity.offset * 2
+            fragment = encoded[start:start + entity.length * 2].decode("utf-16-le", "ignore")
+            # A code span holding just the CA needs no scan; validation below rejects anything else
+            if isinstance(entity, MessageEntityCode) and 32 <= len(fragment) <= 44 and fragment.isalnum():
+                candidates.append(fragment)
+                continue
+        else:
+            continue
+        candidates.extend(link.address for link in scan_links(fragment))
+    return filter_valid_addresses(candidates)
+
+
+def extract_from_entities(message, group_id):
+    """
+    Extract a call, taking the CA from message entities and only falling back
+    to scanning the raw text when no entity yields one. With an entity CA only
+    the template's small token name and market cap patterns run on the text.
+
+    Args:
+        message (telethon.tl.custom.message.Message): The incoming message.
+        group_id (int): The source group ID, used to pick the template.
+
+    Returns:
+        ExtractedCall: The call, or None if the message holds no valid contract address.
+    """
+    text = message.message or ""
+    addresses = entity_addresses(message)
+    if not addresses:
+        return extract_contract(text, group_id)
+
+    return template_for_group(group_id).extract_fields(text, addresses[0])
+
+
+def extract_from_message(message, group_id):
+    """
+    Cached variant of extract_from_entities. Messages without entities take
+    the plain text pipeline; otherwise hidden text URLs are part of the cache
+    key since they are not visible in the message text.
+
+    Args:
+        message (telethon.tl.custom.message.Message): The incoming message.
+        group_id (int): The source group ID.
+
+    Returns:
+        ExtractedCall: The call, or None if the message holds no valid contract address.
+    """
+    text = message.message or ""
+    if not message.entities:
+        return extract_contract_cached(text, group_id)
+
+    hidden_urls = [entity.url for entity in message.entities or () if isinstance(entity, MessageEntityTextUrl)]
+    if hidden_urls:
+        text = "\x00".join([text, *hidden_urls])
+
+    key = extraction_cache.make_key(text, template_for_group(group_id).name)
+    result = extraction_cache.get(key)
+    if result is CACHE_MISS:
+        result = extract_from_entities(message, group_id)
+        extraction_cache.put(key, result)
+    return result
@@ -0,0 +1,283 @@
+import re
+import time
+import hashlib
+from collections import OrderedDict, namedtuple
+from .constants import EXTRACTION_CACHE_SIZE, EXTRACTION_CACHE_TTL, SOLANA_ADDRESS_PATTERN
+from .scanner import SOURCE_ADDRESS, SOURCE_RANK, scan_links
+from .validation import is_valid_address
+
+# Result of a successful template match
+ExtractedCall = namedtuple("ExtractedCall", ["token_name", "market_cap", "contract_address"])
+
+# Returned by ExtractionCache.get when a message has not been parsed yet
+CACHE_MISS = object()
+
+# Contract address fragment shared by every template; the boundary keeps a longer run from being cut
+# down to a different address that still validates
+CA_FRAGMENT = rf"(?P<contract_address>{SOLANA_ADDRESS_PATTERN})(?![1-9A-HJ-NP-Za-km-z])"
+
+
+class CallTemplate:
+    """
+    A precompiled call layout that pulls token name, market cap and contract
+    address out of a message in a single regex pass.
+
+    The token name and market cap also have small patterns of their own, used
+    when the contract address already came from the message entities.
+    """
+    __slots__ = ("name", "pattern", "token_pattern", "market_cap_pattern")
+
+    def __init__(self, name, pattern, token_pattern, market_cap_pattern, flags=0):
+        """
+        Compile the template patterns once.
+
+        Args:
+            name (str): The template name referenced from group configs.
+            pattern (str): Regex with `token_name`, `market_cap` and `contract_address` groups.
+            token_pattern (str): Regex whose first group is the token name.
+            market_cap_pattern (str): Regex whose first group is the market cap.
+            flags (int, optional): Extra regex flags. Defaults to 0.
+        """
+        self.name = name
+        self.pattern = re.compile(pattern, flags)
+        self.token_pattern = re.compile(token_pattern, flags)
+        self.market_cap_pattern = re.compile(market_cap_pattern, flags)
+
+    def extract(self, text):
+        """
+        Match the template against a message.
+
+        Args:
+            text (str): The raw message text.
+
+        Returns:
+            ExtractedCall: The extracted fields, or None if the layout does not match.
+        """
+        match = self.pattern.search(text)
+        if match is None:
+            return None
+        token_name, market_cap, contract_address = match.group("token_name", "market_cap", "contract_address")
+        return ExtractedCall(token_name.strip(), market_cap, contract_address)
+
+    def extract_fields(self, text, contract_address):
+        """
+        Find the token name and market cap around an already known contract address.
+
+        Args:
+            text (str): The raw message text.
+            contract_address (str): The validated contract address.
+
+        Returns:
+            ExtractedCall: The call; token name and market cap are None unless both are found.
+        """
+        token_match = self.token_pattern.search(text)
+        market_cap_match = token_match and self.market_cap_pattern.search(text)
+        if not market_cap_match:
+            return ExtractedCall(None, None, contract_address)
+        return ExtractedCall(token_match.group(1).strip(), market_cap_match.group(1), contract_address)
+
+
+# Known call layouts, keyed by template name
+TEMPLATES = {
+    # "Name | @channel ... 💹MC: $123,456.78 ... CA: <address>"
+    "default": CallTemplate(
+        "default",
+        r"^(?P<token_name>[^\n]*?) \| @.*?💹MC: \$(?P<market_cap>[\d,]+\.\d+).*?CA: " + CA_FRAGMENT,
+        r"^([^\n]*?) \| @",
+        r"💹MC: \$([\d,]+\.\d+)",
+        re.MULTILINE | re.DOTALL,
+    ),
+    # "Token: Name ... Market Cap: $123,456 ... Contract: <address>"
+    "labeled": CallTemplate(
+        "labeled",
+        r"Token:[ \t]*(?P<token_name>[^\n]+?)[ \t]*\n.*?(?:Market Cap|MC):[ \t]*\$(?P<market_cap>[\d,]+(?:\.\d+)?)"
+        r".*?(?:CA|Contract|Address):[ \t]*" + CA_FRAGMENT,
+        r"Token:[ \t]*([^\n]+?)[ \t]*\n",
+        r"(?:Market Cap|MC):[ \t]*\$([\d,]+(?:\.\d+)?)",
+        re.DOTALL | re.IGNORECASE,
+    ),
+    # "Name ($TICKER) ... $123,456 MC ... <address>" on its own line
+    "compact": CallTemplate(
+        "compact",
+        r"^(?P<token_name>[^\n]+?\(\$[A-Za-z0-9_]+\))[ \t]*\n.*?\$(?P<market_cap>[\d,]+(?:\.\d+)?)[ \t]*MC\b"
+        r".*?^[ \t]*" + CA_FRAGMENT + r"[ \t]*$",
+        r"^([^\n]+?\(\$[A-Za-z0-9_]+\))[ \t]*\n",
+        r"\$([\d,]+(?:\.\d+)?)[ \t]*MC\b",
+        re.MULTILINE | re.DOTALL,
+    ),
+}
+
+DEFAULT_TEMPLATE = TEMPLATES["default"]
+
+# Mapping of source group IDs to the template used for their messages
+group_templates = {}
+
+
+def assign_group_template(group_id, template_name):
+    """
+    Select the call template used for a source group.
+
+    Args:
+        group_id (int | str): The source group ID.
+        template_name (str): A key of TEMPLATES; unknown names fall back to the default.
+    """
+    group_templates[int(group_id)] = TEMPLATES.get(template_name, DEFAULT_TEMPLATE)
+
+
+def template_for_group(group_id):
+    """
+    Look up the call template for a source group.
+
+    Args:
+        group_id (int): The source group ID.
+
+    Returns:
+        CallTemplate: The assigned template, or the default layout.
+    """
+    return group_templates.get(group_id, DEFAULT_TEMPLATE)
+
+
+def extract_call(text, group_id):
+    """
+    Extract token name, market cap and contract address from a call message.
+
+    Args:
+        text (str): The raw message text.
+        group_id (int): The source group ID, used to pick the template.
+
+    Returns:
+        ExtractedCall: The extracted fields, or None if the message is not a call.
+    """
+    return template_for_group(group_id).extract(text)
+
+
+def extract_contract(text, group_id):
+    """
+    Run the full extraction pipeline: the group's template first, then the
+    best-ranked validated address in the message. A labeled CA beats a token
+    link, which beats a bare address; a bare address is only taken when it is
+    the message's only candidate, since chatter often quotes wallets and
+    transactions.
+
+    Args:
+        text (str): The raw message text.
+        group_id (int): The source group ID, used to pick the template.
+
+    Returns:
+        ExtractedCall: The call (token name and market cap are None for link-only
+            matches), or None if the message holds no valid contract address.
+    """
+    call = extract_call(text, group_id)
+    if call is not None and is_valid_address(call.contract_address):
+        return call
+
+    links = [link for link in scan_links(text) if is_valid_address(link.address)]
+    if not links:
+        return None
+    best = min(links, key=lambda link: SOURCE_RANK[link.source])
+    if best.source == SOURCE_ADDRESS and len(links) > 1:
+        return None
+    return ExtractedCall(None, None, best.address)
+
+
+class ExtractionCache:
+    """
+    Bounded LRU cache with a TTL for extraction results, keyed by a digest of
+    the message text and the template that parsed it. Negative results are
+    cached too, so reposted non-calls are also a single dict lookup.
+    """
+
+    def __init__(self, maxsize=EXTRACTION_CACHE_SIZE, ttl=EXTRACTION_CACHE_TTL):
+        """
+        Args:
+            maxsize (int, optional): Maximum number of cached messages.
+            ttl (float, optional): Seconds before an entry is parsed again.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def make_key(text, template_name):
+        """
+        Build the cache key for a message.
+
+        Args:
+            text (str): The raw message text.
+            template_name (str): The template used for the message's group.
+
+        Returns:
+            tuple: The template name and a 16-byte BLAKE2 digest of the text.
+        """
+        return template_name, hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def get(self, key):
+        """
+        Look up a cached result.
+
+        Args:
+            key (tuple): A key from make_key.
+
+        Returns:
+            The cached result (which may be None), or CACHE_MISS.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return CACHE_MISS
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, result):
+        """
+        Store a result, evicting the least recently used entry when full.
+
+        Args:
+            key (tuple): A key from make_key.
+            result (ExtractedCall | None): The extraction result.
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Report cache effectiveness.
+
+        Returns:
+            dict: Entry count, hits, misses and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared by every user client in the process
+extraction_cache = ExtractionCache()
+
+
+def extract_contract_cached(text, group_id):
+    """
+    Cached variant of extract_contract.
+
+    Args:
+        text (str): The raw message text.
+        group_id (int): The source group ID.
+
+    Returns:
+        ExtractedCall: The call, or None if the message holds no valid contract address.
+    """
+    key = extraction_cache.make_key(text, template_for_group(group_id).name)
+    result = extraction_cache.get(key)
+    if result is CACHE_MISS:
+        result = extract_contract(text, group_id)
+        extraction_cache.put(key, result)
+    return result
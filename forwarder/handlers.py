@@ -1,74 +1,176 @@
-import re
-import time
+import asyncio
 from telethon import events
-from .helpers import fetch_user_config, forwarded_cas, round_to_k, track_forwarded_address
+from .config import config_cache
+from .dedupe import scope_id
+from .entities import extract_from_message
+from .metrics import STAGE_CONFIG, STAGE_DEDUPE, STAGE_ENQUEUE, STAGE_EXTRACTION, CallTrace, latency_metrics
+from .outbox import PRIORITY_URGENT, Outbox, outboxes
+from .persistence import forwarded_cas_backend
+from .rendering import forward_template
+from .routing import DESTINATION_TRADING_BOT
+from .validation import decode_address
 
-@events.register(events.NewMessage)
-async def forward_message(event):
+
+class WatchedChats(events.NewMessage):
+    """
+    NewMessage builder whose `chats` filter can be replaced while the client
+    runs, so Telethon drops updates from unwatched chats inside its own dispatch.
     """
-    Handles new messages and forwards them based on user configuration.
+
+    def __init__(self, chat_ids):
+        """
+        Args:
+            chat_ids (Iterable[int]): Marked chat IDs to listen to; may be empty.
+        """
+        super().__init__(chats=set(chat_ids))
+
+    async def _resolve(self, client):
+        # IDs come from the routing index already marked, so no entity lookups are needed
+        self.chats = set(self.chats)
+
+    def update(self, chat_ids):
+        """
+        Replace the watched chats in place.
+
+        Args:
+            chat_ids (Iterable[int]): Marked chat IDs to listen to.
+        """
+        self.chats = set(chat_ids)
+
+
+def register_forwarder(client, user_id):
+    """
+    Attach the forwarder to a user's client, filtered to the user's active
+    source groups and kept in sync with config reloads.
 
     Args:
-        event (telethon.events.newmessage.NewMessage.Event): Event triggered by a new message.
+        client (telethon.TelegramClient): The user's connected client.
+        user_id (int): The ID of the user who owns the client.
+
+    Returns:
+        Callable: The config reload listener, for config_cache.remove_listener on shutdown.
     """
-    user_id = event.sender_id
+    watched = WatchedChats(config_cache.routing.chat_ids(user_id))
+    outbox = outboxes[user_id] = Outbox(client)
+    client.add_event_handler(make_forward_handler(user_id, outbox), watched)
 
-    try:
-        # Fetch user-specific configurations
-        group_notifiers, notifier_keys = fetch_user_config(user_id)
+    def refresh_filter():
+        watched.update(config_cache.routing.chat_ids(user_id))
 
-        # Extract message content and group ID
-        message_text = event.message.message or ""
-        group_id = str(event.chat_id)
+    config_cache.add_listener(refresh_filter)
+    return refresh_filter
 
-        # Debugging: Print incoming message details
-        print(f"Incoming message from Group {group_id}, Sender {user_id}: {message_text}")
 
-        # Define patterns to extract token name, market cap, and contract address
-        token_pattern = r"^(.*?) \| @"  # Extract token name
-        mc_pattern = r"💹MC: \$([\d,]+\.\d+)"  # Extract market cap
-        ca_pattern = r"CA: ([a-zA-Z0-9]{32,44})"  # Extract contract address
+async def claim_destinations(subscriber, key):
+    """
+    Claim a call for each of a subscriber's destinations concurrently.
 
-        # Perform regex matching
-        token_match = re.search(token_pattern, message_text, re.MULTILINE)
-        mc_match = re.search(mc_pattern, message_text)
-        ca_match = re.search(ca_pattern, message_text)
+    Destinations that share a dedupe scope share one claim. A claim that
+    fails only drops the destinations in its scope.
 
-        # Ensure all required details are present
-        if not token_match or not mc_match or not ca_match:
-            print("Error: Unable to extract token name, market cap, or contract address.")
-            return
+    Args:
+        subscriber (forwarder.routing.Subscriber): The routed subscriber.
+        key (bytes): The decoded contract address.
+
+    Returns:
+        list[forwarder.routing.Destination]: Destinations that have not received the call yet.
+    """
+    if subscriber.exempt:
+        return list(subscriber.destinations)
+    scopes = {destination: scope_id(subscriber, destination) for destination in subscriber.destinations}
+    unique_scopes = list(dict.fromkeys(scopes.values()))
+    results = await asyncio.gather(
+        *(forwarded_cas_backend.claim(key, scope) for scope in unique_scopes),
+        return_exceptions=True,
+    )
+    claimed = set()
+    for scope, result in zip(unique_scopes, results):
+        if isinstance(result, Exception):
+            print(f"Error claiming CA for scope {scope}: {result}")
+        elif result:
+            claimed.add(scope)
+    return [destination for destination in subscriber.destinations if scopes[destination] in claimed]
 
-        # Extract values
-        token_name = token_match.group(1).strip()
-        market_cap = round_to_k(mc_match.group(1))
-        contract_address = ca_match.group(1)
 
-        # Check if the contract address is already forwarded
-        if not track_forwarded_address(contract_address):
-            print("No new Solana address or keywords found.")
+def make_forward_handler(user_id, outbox):
+    """
+    Build the NewMessage handler for one user's client.
+
+    Args:
+        user_id (int): The ID of the user who owns the client.
+        outbox (forwarder.outbox.Outbox): The client's outbound queue.
+
+    Returns:
+        Callable: The coroutine to register with `client.add_event_handler`.
+    """
+    # Live {chat_id: Subscriber} map, rebuilt in place when configs change
+    routes = config_cache.routing.for_user(user_id)
+
+    async def forward_message(event):
+        """
+        Handles new messages and forwards them based on user configuration.
+
+        Args:
+            event (telethon.events.newmessage.NewMessage.Event): Event triggered by a new message.
+        """
+        # Drop messages from chats the user does not watch before touching the text
+        subscriber = routes.get(event.chat_id)
+        if subscriber is None:
             return
 
-        # Retrieve notifier and notifier key
-        notifier = group_notifiers.get(group_id, "Insider Play")
-        notifier_key = notifier_keys.get(notifier, "1")
-
-        # Construct the forwarding message
-        forward_message = (
-            f"{notifier}\n\n"
-            f"{token_name}\n"
-            f"MC: {market_cap}\n\n"
-            f"{contract_address}\n\n"
-            "🤖 Ape Faster, Use bot below:\n"
-            f"[Trojan](https://t.me/helenus_trojanbot?start=r-kaoru9-{contract_address}) | "
-            f"[Maestro](https://t.me/MaestroSniperBot?start={contract_address}-kaoru91819) | "
-            f"[Bonk Bot](https://t.me/bonkbot_bot?start=ref_fnhex_ca_{contract_address}) | "
-            f"[STB](https://t.me/SolTradingBot_Europe_Bot?start={contract_address}-lUNqcvksz)\n\n"
-        )
-
-        # Forward the constructed message to the user
-        await event.client.send_message(user_id, forward_message, parse_mode="Markdown")
-        print(f"Forwarded message with CA: {contract_address}.")
-    except Exception as e:
-        # Log the exception for debugging
-        print(f"Error: {e}")
+        # Stage timings from the source post to each destination's send ack; only routed chats are traced
+        trace = CallTrace(latency_metrics, user_id, event.chat_id, event.message.date.timestamp())
+        trace.mark(STAGE_CONFIG)
+
+        try:
+            # Extract message content
+            message_text = event.message.message or ""
+
+            # Debugging: Print incoming message details
+            print(f"Incoming message from Group {event.chat_id}, User {user_id}: {message_text}")
+
+            # Extract token name, market cap, and contract address; entities first, reposts hit the cache
+            call = extract_from_message(event.message, event.chat_id)
+            if call is None:
+                print("Error: Unable to extract token name, market cap, or contract address.")
+                return
+            trace.mark(STAGE_EXTRACTION)
+
+            # Splice the call into the precompiled template before claiming it, so a call that cannot be
+            # rendered is not marked forwarded; links are sent as entities, so nothing is parsed per send
+            contract_address = call.contract_address
+            forward_text, forward_entities = forward_template.render(
+                subscriber.notifier, contract_address, call.token_name, call.market_cap
+            )
+
+            # Keep only destinations that have not received the contract address, from any process (exempt groups always forward)
+            destinations = await claim_destinations(subscriber, decode_address(contract_address))
+            if not destinations:
+                print("No new Solana address or keywords found.")
+                return
+            trace.mark(STAGE_DEDUPE)
+
+            # Trading bots get the bare CA on the urgent lane before any notification is queued
+            autobuy = None
+            for destination in destinations:
+                if destination.kind == DESTINATION_TRADING_BOT:
+                    autobuy = outbox.enqueue(
+                        destination.chat_id, contract_address,
+                        priority=PRIORITY_URGENT, trace=trace, parse_mode=None, link_preview=False,
+                    )
+
+            # Queue the notification for the other destinations; each has its own outbox worker, so they
+            # are sent concurrently, but never before this call's trading bot send has gone out
+            for destination in destinations:
+                if destination.kind != DESTINATION_TRADING_BOT:
+                    outbox.enqueue(
+                        destination.chat_id, forward_text, after=autobuy, trace=trace,
+                        formatting_entities=forward_entities,
+                    )
+            trace.mark(STAGE_ENQUEUE)
+            print(f"Queued message with CA: {contract_address} for {len(destinations)} destination(s).")
+        except Exception as e:
+            # Log the exception for debugging
+            print(f"Error: {e}")
+
+    return forward_message
@@ -1,39 +1,73 @@
+import os
 import asyncio
+import signal
+import argparse
 from telethon import TelegramClient
-from forwarder.utils.config_loader import load_config
-from forwarder.utils.mongo import get_users_collection
-from forwarder.handlers.message_handler import forward_message
-from forwarder.tasks.cleanup import clean_forwarded_cas
+from db_indexes import ensure_indexes
+from forwarder.config import config_cache
+from forwarder.registry import ClientRegistry
+from forwarder.stats_server import serve_stats
+from forwarder.persistence import forwarded_cas_backend
+from forwarder.sharding import HashRing
+from forwarder.constants import STATS_PORT
 
-# Load configuration
-config = load_config()
-API_ID = config["api_id"]
-API_HASH = config["api_hash"]
+# Load configuration (the repository module already loaded .env)
+API_ID = os.getenv("API_ID")
+API_HASH = os.getenv("API_HASH")
 
-# MongoDB connection
-users_collection = get_users_collection()
+async def main(shard=None, shards=1):
+    """
+    Run the forwarder for every user, or for one shard of them under the supervisor.
 
-async def main():
-    clients = []
+    Args:
+        shard (int, optional): This worker's shard index; None runs every user in one process.
+        shards (int, optional): Total number of shards.
+    """
+    # A sharded worker only loads the sessions and configs of the users it owns
+    owns = None
+    if shard is not None:
+        ring = HashRing(shards)
+        owns = lambda user_id: ring.owns(shard, user_id)
+        config_cache.owns = owns
 
-    # Fetch all users with session files
-    users = users_collection.find({})
-    for user in users:
-        session_name = user['session_name']
-        client = TelegramClient(session_name, API_ID, API_HASH)
-        await client.start()
+    # Create missing indexes before any client starts; indexes that need a rebuild are only reported
+    await ensure_indexes()
 
-        # Add message handler for the user client
-        client.add_event_handler(forward_message)
-        clients.append(client)
+    # Warm or open the dedupe backend so a restart does not re-forward recent calls
+    await forwarded_cas_backend.load()
+
+    # Load every user's group configs once; later changes arrive via the version poll
+    await config_cache.refresh()
+
+    def make_client(user):
+        # Sessions saved by the admin bot's login come from MongoDB; older file sessions still load by name.
+        # FloodWaits are raised to the outbox, which pauses only the affected destination
+        return TelegramClient(user.get('session') or user['session_name'], API_ID, API_HASH, flood_sleep_threshold=0)
+
+    # Connect every logged-in user's client concurrently; each listens as soon as it is authorized
+    registry = ClientRegistry(make_client, owns)
+    await registry.sync()
+    print(f"Started {len(registry.clients)} clients, skipped {len(registry.skipped)}.")
+
+    # Logins and logouts bump the config version; start or stop just those clients
+    config_cache.add_listener(registry.request_sync)
+
+    # The supervisor stops workers with SIGTERM; shut down the same way as on Ctrl+C
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
 
     print("Bots are running, listening for messages...")
     try:
-        await asyncio.gather(*[client.run_until_disconnected() for client in clients], clean_forwarded_cas())
-    except KeyboardInterrupt:
+        # Clients receive updates in their own background tasks; these loops keep the process alive
+        await asyncio.gather(config_cache.poll(), forwarded_cas_backend.run(), serve_stats(port=STATS_PORT + (shard or 0)))
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("Shutting down gracefully...")
-        for client in clients:
-            await client.disconnect()
+    finally:
+        await registry.close()
+        await forwarded_cas_backend.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Forward calls from source groups to each user's destinations.")
+    parser.add_argument("--shard", type=int, help="shard index when run as a supervised worker")
+    parser.add_argument("--shards", type=int, default=1, help="total number of shards")
+    args = parser.parse_args()
+    asyncio.run(main(args.shard, args.shards))
@@ -0,0 +1,196 @@
+import time
+
+# Each power-of-two range of microseconds is split into 2**SUB_BUCKET_BITS linear buckets
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Pipeline stages of a call, in order; *_urgent variants are trading bot sends
+STAGE_TELEGRAM = "telegram"  # source post (message.date) -> handler entry
+STAGE_CONFIG = "config"  # routing lookup
+STAGE_EXTRACTION = "extraction"  # token name, MC and CA extraction
+STAGE_DEDUPE = "dedupe"  # rendering the forward and claiming the CA for the destinations
+STAGE_ENQUEUE = "enqueue"  # queuing on the outbox
+STAGE_SEND = "send"  # outbox queue wait, rate limits and send_message until Telegram acks
+STAGE_TOTAL = "total"  # source post -> send ack
+
+
+def _bucket_index(micros):
+    if micros < SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift << SUB_BUCKET_BITS) + (micros >> shift)
+
+
+def _bucket_upper(index):
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = (index & (SUB_BUCKETS - 1)) + SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of durations.
+
+    Values are counted in microsecond buckets whose width doubles every
+    power of two, so any quantile is within 1/SUB_BUCKETS (about 6%) of the
+    true value while memory stays proportional to the range seen, not the
+    number of samples.
+    """
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """
+        Add one duration.
+
+        Args:
+            seconds (float): The duration; negative values (clock skew) count as 0.
+        """
+        if seconds < 0:
+            seconds = 0.0
+        index = _bucket_index(int(seconds * 1e6))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """
+        Estimate a quantile.
+
+        Args:
+            q (float): The quantile, e.g. 0.99.
+
+        Returns:
+            float: Seconds at or below which a fraction q of the durations fall; 0 if empty.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(_bucket_upper(index) / 1e6, self.max)
+        return self.max
+
+
+class LatencyMetrics:
+    """
+    Stage latency histograms of forwarded calls, kept per user and per source group.
+    """
+
+    def __init__(self):
+        # (stage, user_id) -> histogram and (stage, chat_id) -> histogram
+        self.by_user = {}
+        self.by_group = {}
+
+    def record(self, stage, user_id, chat_id, seconds):
+        """
+        Record one stage duration of a call.
+
+        Args:
+            stage (str): One of the STAGE_* names, optionally with an "_urgent" suffix.
+            user_id (int): The user whose client handled the call.
+            chat_id (int): The source group the call came from.
+            seconds (float): The stage duration.
+        """
+        histogram = self.by_user.get((stage, user_id))
+        if histogram is None:
+            histogram = self.by_user[stage, user_id] = LatencyHistogram()
+        histogram.record(seconds)
+        histogram = self.by_group.get((stage, chat_id))
+        if histogram is None:
+            histogram = self.by_group[stage, chat_id] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def summary(self, user_id=None, quantiles=(0.5, 0.99)):
+        """
+        Summarize stage latencies across users, or for one user.
+
+        Args:
+            user_id (int, optional): Only include this user's calls. Defaults to every user.
+            quantiles (tuple[float], optional): Quantiles to report.
+
+        Returns:
+            dict: stage -> {"count": int, "max": float, "p50": float, ...} in seconds.
+        """
+        merged = {}
+        for (stage, owner), histogram in self.by_user.items():
+            if user_id is not None and owner != user_id:
+                continue
+            target = merged.setdefault(stage, LatencyHistogram())
+            for index, count in histogram.counts.items():
+                target.counts[index] = target.counts.get(index, 0) + count
+            target.count += histogram.count
+            target.total += histogram.total
+            target.max = max(target.max, histogram.max)
+        return {
+            stage: {
+                "count": histogram.count,
+                "max": histogram.max,
+                **{f"p{round(q * 100)}": histogram.quantile(q) for q in quantiles},
+            }
+            for stage, histogram in merged.items()
+        }
+
+
+class CallTrace:
+    """
+    Stage timer of one call, from the source post to each destination's send ack.
+    """
+    __slots__ = ("metrics", "user_id", "chat_id", "posted_at", "last", "enqueued")
+
+    def __init__(self, metrics, user_id, chat_id, posted_at):
+        """
+        Records the telegram stage as the trace starts.
+
+        Args:
+            metrics (LatencyMetrics): Where durations are recorded.
+            user_id (int): The user whose client handles the call.
+            chat_id (int): The source group.
+            posted_at (float): Epoch seconds of the source post (message.date, 1s resolution).
+        """
+        self.metrics = metrics
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.posted_at = posted_at
+        metrics.record(STAGE_TELEGRAM, user_id, chat_id, time.time() - posted_at)
+        self.last = time.perf_counter()
+        self.enqueued = self.last
+
+    def mark(self, stage):
+        """
+        Record the time since the previous mark as one stage.
+
+        Args:
+            stage (str): The stage that just finished.
+        """
+        now = time.perf_counter()
+        self.metrics.record(stage, self.user_id, self.chat_id, now - self.last)
+        self.last = now
+        if stage == STAGE_ENQUEUE:
+            self.enqueued = now
+
+    def delivered(self, urgent=False):
+        """
+        Record the send and end-to-end stages once a destination acked the message.
+
+        Args:
+            urgent (bool, optional): The message went out on the urgent lane.
+        """
+        suffix = "_urgent" if urgent else ""
+        self.metrics.record(STAGE_SEND + suffix, self.user_id, self.chat_id, time.perf_counter() - self.enqueued)
+        self.metrics.record(STAGE_TOTAL + suffix, self.user_id, self.chat_id, time.time() - self.posted_at)
+
+
+# Stage latencies of every call handled by this process
+latency_metrics = LatencyMetrics()
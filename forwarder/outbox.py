@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import time
+from telethon.errors import FloodWaitError
+from .constants import (
+    SEND_BURST_GLOBAL,
+    SEND_BURST_PER_DESTINATION,
+    SEND_MAX_RETRIES,
+    SEND_RATE_GLOBAL,
+    SEND_RATE_PER_DESTINATION,
+    SEND_RETRY_DELAY,
+    SEND_URGENT_WORKERS,
+)
+
+# Delivery classes: urgent sends (trading bot autobuy) take account-wide tokens before normal ones
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: `rate` tokens per second, at most `burst` saved up.
+    """
+    __slots__ = ("rate", "burst", "tokens", "updated", "clock", "urgent_waiting")
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            burst (float): Bucket size; the bucket starts full.
+            clock (Callable[[], float], optional): Time source, monotonic by default.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.updated = clock()
+        self.urgent_waiting = 0
+
+    def take(self):
+        """
+        Take one token if available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available.
+        """
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self, urgent=False):
+        """
+        Wait until a token is available and take it.
+
+        Args:
+            urgent (bool, optional): Serve this caller before every non-urgent waiter.
+        """
+        if urgent:
+            self.urgent_waiting += 1
+        try:
+            while True:
+                # Normal callers leave refilled tokens alone while an urgent caller waits
+                delay = self.take() if urgent or not self.urgent_waiting else 1 / self.rate
+                if not delay:
+                    return
+                await asyncio.sleep(delay)
+        finally:
+            if urgent:
+                self.urgent_waiting -= 1
+
+
+class Outgoing:
+    """
+    One queued message. Urgent messages carry a `dispatched` event, set once
+    the first send attempt starts, that messages queued `after` them wait on.
+    """
+    __slots__ = ("destination", "text", "kwargs", "priority", "after", "trace", "dispatched", "queued_at", "attempts")
+
+    def __init__(self, destination, text, kwargs, priority, after, trace, queued_at):
+        self.destination = destination
+        self.text = text
+        self.kwargs = kwargs
+        self.priority = priority
+        self.after = after
+        self.trace = trace
+        self.dispatched = asyncio.Event() if priority == PRIORITY_URGENT else None
+        self.queued_at = queued_at
+        self.attempts = 0
+
+
+class Outbox:
+    """
+    Outbound message queue of one client.
+
+    Each destination chat has its own FIFO queue, drained by its own worker
+    task through a per-destination token bucket and the account-wide bucket.
+    A FloodWaitError pauses only the destination it was raised for, so other
+    destinations and the client's event handlers keep running.
+
+    Urgent messages are served first by the account-wide bucket, and a
+    destination first used for an urgent message gets several workers so its
+    sends overlap instead of queuing behind each other's round trips. A
+    message can be held until an urgent one for the same call is dispatched.
+    """
+
+    def __init__(
+        self,
+        client,
+        rate=SEND_RATE_GLOBAL,
+        burst=SEND_BURST_GLOBAL,
+        destination_rate=SEND_RATE_PER_DESTINATION,
+        destination_burst=SEND_BURST_PER_DESTINATION,
+        max_retries=SEND_MAX_RETRIES,
+        retry_delay=SEND_RETRY_DELAY,
+        urgent_workers=SEND_URGENT_WORKERS,
+    ):
+        """
+        Args:
+            client (telethon.TelegramClient): The client messages are sent with.
+            rate (float, optional): Messages per second for the whole account.
+            burst (float, optional): Account-wide burst size.
+            destination_rate (float, optional): Messages per second per destination chat.
+            destination_burst (float, optional): Burst size per destination chat.
+            max_retries (int, optional): Retries per message before it is dropped.
+            retry_delay (float, optional): Seconds before retrying an error other than FloodWait.
+            urgent_workers (int, optional): Concurrent sends to a destination used for urgent messages.
+        """
+        self.client = client
+        self.destination_rate = destination_rate
+        self.destination_burst = destination_burst
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.urgent_workers = urgent_workers
+        self.bucket = TokenBucket(rate, burst)
+        self.started = 0
+        self.sent = 0
+        self.retries = 0
+        self.flood_waits = 0
+        self.dropped = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._queues = {}
+        self._buckets = {}
+        self._paused_until = {}
+        self._workers = {}
+
+    def enqueue(self, destination, text, priority=PRIORITY_NORMAL, after=None, trace=None, **kwargs):
+        """
+        Queue a message for sending; never awaits.
+
+        Args:
+            destination (int): The chat to send to.
+            text (str): The message text.
+            priority (int, optional): PRIORITY_URGENT or PRIORITY_NORMAL.
+            after (Outgoing, optional): An urgent message that must be dispatched first.
+            trace (forwarder.metrics.CallTrace, optional): Told when Telegram acks the send.
+            **kwargs: Passed to `client.send_message` (e.g. parse_mode).
+
+        Returns:
+            Outgoing: The queued message, usable as `after` for later messages.
+        """
+        queue = self._queues.get(destination)
+        if queue is None:
+            queue = self._queues[destination] = asyncio.Queue()
+            self._buckets[destination] = TokenBucket(self.destination_rate, self.destination_burst)
+            self._paused_until[destination] = 0.0
+            workers = self.urgent_workers if priority == PRIORITY_URGENT else 1
+            self._workers[destination] = [
+                asyncio.create_task(self._drain(destination, queue)) for _ in range(workers)
+            ]
+        outgoing = Outgoing(destination, text, kwargs, priority, after, trace, time.monotonic())
+        queue.put_nowait(outgoing)
+        return outgoing
+
+    async def _drain(self, destination, queue):
+        bucket = self._buckets[destination]
+        while True:
+            outgoing = await queue.get()
+            try:
+                await self._deliver(outgoing, bucket)
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, outgoing, bucket):
+        if outgoing.after is not None:
+            await outgoing.after.dispatched.wait()
+        destination = outgoing.destination
+        urgent = outgoing.priority == PRIORITY_URGENT
+        while True:
+            # A FloodWait pauses every worker of the destination, not just the one that hit it
+            pause = self._paused_until[destination] - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            await bucket.acquire(urgent)
+            await self.bucket.acquire(urgent)
+            if not outgoing.attempts:
+                self.started += 1
+                waited = time.monotonic() - outgoing.queued_at
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+                if urgent:
+                    outgoing.dispatched.set()
+            outgoing.attempts += 1
+            try:
+                await self.client.send_message(destination, outgoing.text, **outgoing.kwargs)
+                self.sent += 1
+                if outgoing.trace is not None:
+                    outgoing.trace.delivered(urgent)
+                return
+            except FloodWaitError as e:
+                # Only this destination waits; the rest of the outbox keeps sending
+                self.flood_waits += 1
+                delay = e.seconds
+                self._paused_until[destination] = max(self._paused_until[destination], time.monotonic() + delay)
+                logging.warning(f"FloodWait of {e.seconds}s sending to {destination}.")
+            except Exception as e:
+                delay = self.retry_delay
+                logging.error(f"Error sending to {destination}: {e}")
+            if outgoing.attempts > self.max_retries:
+                self.dropped += 1
+                logging.error(f"Dropped message to {destination} after {outgoing.attempts} attempts.")
+                return
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def depth(self):
+        """
+        Count the messages waiting to be sent.
+
+        Returns:
+            int: Queued messages across every destination.
+        """
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    async def drain(self):
+        """
+        Wait until every queued message has been sent or dropped.
+        """
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+
+    async def close(self):
+        """
+        Stop every worker; messages still queued are discarded.
+        """
+        workers = [worker for destination_workers in self._workers.values() for worker in destination_workers]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+        self._buckets.clear()
+        self._paused_until.clear()
+
+    def stats(self):
+        """
+        Report queue and delivery counters.
+
+        Returns:
+            dict: Depth, per-destination depth, sent, retries, FloodWaits, drops and queue wait times.
+        """
+        return {
+            "depth": self.depth(),
+            "destinations": {destination: queue.qsize() for destination, queue in self._queues.items()},
+            "sent": self.sent,
+            "retries": self.retries,
+            "flood_waits": self.flood_waits,
+            "dropped": self.dropped,
+            "wait_avg": self.wait_total / self.started if self.started else 0.0,
+            "wait_max": self.wait_max,
+        }
+
+
+# Outbox of every running client, by user ID
+outboxes = {}
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from pymongo import ReplaceOne
+from repository import bulk_write_forwarded_cas, claim_forwarded_ca, find_live_forwarded_cas
+from .constants import DEDUPE_BACKEND, DEDUPE_FLUSH_BATCH, DEDUPE_FLUSH_INTERVAL, DEDUPE_SQLITE_PATH
+from .dedupe import forwarded_cas, restore_entries
+from .dedupe_backends import (
+    BACKEND_LOCAL,
+    BACKEND_MONGO,
+    BACKEND_SQLITE,
+    LocalDedupeBackend,
+    SharedDedupeBackend,
+    SQLiteDedupeBackend,
+)
+
+
+def entry_id(key, scope):
+    """
+    Build the forwarded_cas _id of a (scope, key) pair.
+
+    Args:
+        key (bytes): The decoded contract address.
+        scope (int): The dedupe scope ID.
+
+    Returns:
+        bytes: 8 signed big-endian scope bytes followed by the key.
+    """
+    return scope.to_bytes(8, "big", signed=True) + key
+
+
+class DedupePersister:
+    """
+    Write-behind persistence for a DedupeStore.
+
+    New entries are queued in memory by `record`, which never awaits, and a
+    background task writes them to the forwarded_cas TTL collection in batched
+    bulk writes. On startup `load` restores every entry that has not expired,
+    so a restart does not re-forward recent calls.
+    """
+
+    def __init__(self, store, interval=DEDUPE_FLUSH_INTERVAL, batch_size=DEDUPE_FLUSH_BATCH):
+        """
+        Args:
+            store (forwarder.dedupe.DedupeStore): The store to persist.
+            interval (float, optional): Seconds between flushes.
+            batch_size (int, optional): Maximum writes per bulk_write call.
+        """
+        self.store = store
+        self.interval = interval
+        self.batch_size = batch_size
+        self.written = 0
+        self._pending = []
+
+    def record(self, key, scope):
+        """
+        Queue a newly tracked entry for persistence; O(1) and never blocks.
+
+        Args:
+            key (bytes): The decoded contract address.
+            scope (int): The dedupe scope ID.
+        """
+        self._pending.append((scope, key, datetime.now(timezone.utc)))
+
+    async def flush(self):
+        """
+        Write every queued entry in batches.
+        """
+        ttl = timedelta(seconds=self.store.ttl)
+        while self._pending:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            operations = [
+                ReplaceOne(
+                    {"_id": entry_id(key, scope)},
+                    {"scope": scope, "key": key, "created_at": created_at, "expires_at": created_at + ttl},
+                    upsert=True,
+                )
+                for scope, key, created_at in batch
+            ]
+            try:
+                await bulk_write_forwarded_cas(operations)
+                self.written += len(operations)
+            except Exception as e:
+                # Keep the batch for the next flush rather than losing it
+                self._pending = batch + self._pending
+                logging.error(f"Error persisting forwarded CAs: {e}")
+                return
+
+    async def run(self):
+        """
+        Flush queued entries periodically.
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def load(self):
+        """
+        Restore non-expired entries into the store.
+
+        Returns:
+            int: Number of entries restored.
+        """
+        now = datetime.now(timezone.utc)
+        documents = await find_live_forwarded_cas(now)
+        restored = restore_entries(self.store, documents, now)
+        logging.info(f"Restored {restored} forwarded CAs from MongoDB.")
+        return restored
+
+
+class MongoDedupeBackend(SharedDedupeBackend):
+    """
+    Dedupe shared by forwarder processes on any host through a unique-_id
+    insert into the forwarded_cas TTL collection, which also makes it the
+    persisted state. The local store answers repeats without a round trip.
+    """
+
+    async def _claim_remote(self, key, scope):
+        now = datetime.now(timezone.utc)
+        document = {
+            "_id": entry_id(key, scope),
+            "scope": scope,
+            "key": key,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.store.ttl),
+        }
+        return await claim_forwarded_ca(document, now)
+
+
+def make_dedupe_backend(name=DEDUPE_BACKEND, store=forwarded_cas):
+    """
+    Build the configured dedupe backend around a store.
+
+    Args:
+        name (str, optional): BACKEND_LOCAL, BACKEND_SQLITE or BACKEND_MONGO.
+        store (forwarder.dedupe.DedupeStore, optional): The process's in-memory store.
+
+    Returns:
+        forwarder.dedupe_backends.DedupeBackend: The backend.
+    """
+    if name == BACKEND_SQLITE:
+        return SQLiteDedupeBackend(DEDUPE_SQLITE_PATH, store, ttl=store.ttl)
+    if name == BACKEND_MONGO:
+        return MongoDedupeBackend(store)
+    if name == BACKEND_LOCAL:
+        return LocalDedupeBackend(store, forwarded_cas_persister)
+    raise ValueError(f"Unknown dedupe backend: {name}")
+
+
+# Persists the process-wide forwarded_cas store
+forwarded_cas_persister = DedupePersister(forwarded_cas)
+
+# Decides which calls this process forwards
+forwarded_cas_backend = make_dedupe_backend()
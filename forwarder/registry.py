@@ -0,0 +1,204 @@
+import time
+import asyncio
+import logging
+from collections import namedtuple
+from telethon import events
+from mongo_session import session_store
+from repository import find_users
+from .config import config_cache
+from .connection import ConnectionSupervisor, client_health
+from .constants import CLIENT_RETRY_BACKOFF, CLIENT_RETRY_BACKOFF_MAX, CLIENT_START_CONCURRENCY, CLIENT_START_TIMEOUT
+from .handlers import register_forwarder
+from .outbox import outboxes
+from .startup import start_clients
+
+# A user whose client could not start: the login it was tried with, why it failed,
+# how many attempts in a row failed for that login and when to try again
+SkippedClient = namedtuple("SkippedClient", ["login", "reason", "attempts", "retry_at"])
+
+
+def login_key(user):
+    """
+    Identify one login of a user; it changes whenever the user logs in again.
+
+    Args:
+        user (dict): User document with session_name and logged_in_at.
+
+    Returns:
+        tuple: The session name and login time.
+    """
+    return user["session_name"], user.get("logged_in_at")
+
+
+class ClientRegistry:
+    """
+    The running user clients of this process, kept in step with the users
+    collection.
+
+    `sync` starts clients for users who logged in, stops those of users who
+    logged out, and restarts a client whose user logged in again. Every other
+    client keeps running untouched. Clients that fail to start are retried
+    with exponential backoff, and right away after a new login. It runs at startup and again whenever
+    the admin bot bumps the config version, which login and logout both do.
+    Each running client has its own ConnectionSupervisor, so a dropped or
+    stalled connection is retried without affecting the others.
+    """
+
+    def __init__(
+        self,
+        make_client,
+        owns=None,
+        limit=CLIENT_START_CONCURRENCY,
+        timeout=CLIENT_START_TIMEOUT,
+        retry_backoff=CLIENT_RETRY_BACKOFF,
+        retry_backoff_max=CLIENT_RETRY_BACKOFF_MAX,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            make_client (Callable[[dict], telethon.TelegramClient]): Builds a user's client.
+            owns (Callable[[int], bool], optional): Shard predicate on user IDs; None runs every user.
+            limit (int, optional): Maximum concurrent connection attempts.
+            timeout (float, optional): Seconds each connection attempt may take.
+            retry_backoff (float, optional): Delay before retrying a client that failed to start.
+            retry_backoff_max (float, optional): Longest retry delay.
+            clock (Callable[[], float], optional): Monotonic time source.
+        """
+        self.make_client = make_client
+        self.owns = owns
+        self.limit = limit
+        self.timeout = timeout
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.clock = clock
+        self.clients = {}
+        # user_id -> SkippedClient of users whose client could not start
+        self.skipped = {}
+        self._logins = {}
+        self._listeners = {}
+        self._supervisors = {}
+        self._dirty = False
+        self._task = None
+        self._retry_timer = None
+
+    def _on_ready(self, client, user):
+        user_id = user["_id"]
+        # Register first: if it raises, start_clients skips the user and nothing here refers to the client
+        self._listeners[user_id] = register_forwarder(client, user_id)
+        self.clients[user_id] = client
+        self._logins[user_id] = login_key(user)
+        supervisor = ConnectionSupervisor(client, user_id)
+        client.add_event_handler(supervisor.touch, events.Raw)
+        client_health[user_id] = supervisor.health
+        self._supervisors[user_id] = asyncio.ensure_future(supervisor.run())
+        self.skipped.pop(user_id, None)
+        logging.info(f"Started client of user {user_id}.")
+
+    async def stop(self, user_id, discard_session=True):
+        """
+        Stop one user's client and release everything it holds.
+
+        Args:
+            user_id (int): The user whose client to stop.
+            discard_session (bool, optional): Drop the session's unsaved changes, as the user
+                logged out or logged in again elsewhere; False keeps them for the next flush.
+        """
+        self.skipped.pop(user_id, None)
+        client = self.clients.pop(user_id, None)
+        if client is None:
+            return
+        self._logins.pop(user_id, None)
+        supervisor = self._supervisors.pop(user_id)
+        supervisor.cancel()
+        await asyncio.gather(supervisor, return_exceptions=True)
+        client_health.pop(user_id, None)
+        config_cache.remove_listener(self._listeners.pop(user_id))
+        outbox = outboxes.pop(user_id, None)
+        if outbox is not None:
+            await outbox.close()
+        await client.disconnect()
+        if discard_session:
+            session_store.discard(user_id)
+        logging.info(f"Stopped client of user {user_id}.")
+
+    async def sync(self):
+        """
+        Start, stop or restart clients so they match the users with a session,
+        and retry skipped clients that are due.
+
+        Returns:
+            tuple[list[int], list[int]]: IDs of the users started and stopped.
+        """
+        users = await find_users({"session_name": {"$exists": True}}, fields=["session_name", "logged_in_at"])
+        wanted = {user["_id"]: user for user in users if self.owns is None or self.owns(user["_id"])}
+
+        stopped = []
+        for user_id in list(self.clients):
+            user = wanted.get(user_id)
+            if user is None or login_key(user) != self._logins[user_id]:
+                await self.stop(user_id)
+                stopped.append(user_id)
+        # Logged-out users are not retried
+        for user_id in [user_id for user_id in self.skipped if user_id not in wanted]:
+            del self.skipped[user_id]
+
+        now = self.clock()
+        pending = []
+        for user_id, user in wanted.items():
+            skip = self.skipped.get(user_id)
+            if user_id not in self.clients and (skip is None or skip.login != login_key(user) or skip.retry_at <= now):
+                pending.append(user)
+        if not pending:
+            self._schedule_retry()
+            return [], stopped
+        # One query for every new user's stored session rather than one per client
+        stored = await session_store.load_many([user["_id"] for user in pending])
+        for user in pending:
+            user["session"] = stored.get(user["_id"])
+        _, skipped = await start_clients(pending, self.make_client, self._on_ready, self.limit, self.timeout)
+        logins = {user["_id"]: login_key(user) for user in pending}
+        now = self.clock()
+        for user_id, reason in skipped.items():
+            previous = self.skipped.get(user_id)
+            attempts = previous.attempts + 1 if previous is not None and previous.login == logins[user_id] else 1
+            delay = min(self.retry_backoff * 2 ** (attempts - 1), self.retry_backoff_max)
+            self.skipped[user_id] = SkippedClient(logins[user_id], reason, attempts, now + delay)
+        self._schedule_retry()
+        return [user["_id"] for user in pending if user["_id"] in self.clients], stopped
+
+    def _schedule_retry(self):
+        # One timer for the earliest due retry; a sync in between reschedules it
+        if self._retry_timer is not None:
+            self._retry_timer.cancel()
+            self._retry_timer = None
+        if self.skipped:
+            delay = max(0, min(skip.retry_at for skip in self.skipped.values()) - self.clock())
+            self._retry_timer = asyncio.get_running_loop().call_later(delay, self.request_sync)
+
+    def request_sync(self):
+        """
+        Schedule a sync without blocking; changes that arrive during a sync trigger one more.
+        Registered as a config cache listener.
+        """
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._sync_pending())
+
+    async def _sync_pending(self):
+        while self._dirty:
+            self._dirty = False
+            try:
+                await self.sync()
+            except Exception as e:
+                logging.error(f"Error syncing user clients: {e}")
+
+    async def close(self):
+        """
+        Stop every client and write their pending session changes.
+        """
+        config_cache.remove_listener(self.request_sync)
+        if self._retry_timer is not None:
+            self._retry_timer.cancel()
+        for user_id in list(self.clients):
+            await self.stop(user_id, discard_session=False)
+        await session_store.close()
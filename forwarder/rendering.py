@@ -0,0 +1,83 @@
+from telethon.tl.types import MessageEntityTextUrl
+from .constants import REFERRAL_BOTS, REFERRAL_HEADER
+from .helpers import round_to_k
+
+# Placeholder for the contract address in referral URL templates
+CA_PLACEHOLDER = "{ca}"
+
+
+def utf16_length(text):
+    """
+    Length of a string in UTF-16 code units, the unit Telegram entity offsets use.
+
+    Args:
+        text (str): Any text.
+
+    Returns:
+        int: Number of UTF-16 code units.
+    """
+    return len(text.encode("utf-16-le")) // 2
+
+
+class ForwardTemplate:
+    """
+    Forward message compiled once into a fixed referral footer plus link
+    entity offsets, so each call only splices in the notifier, token details
+    and CA and is sent with `formatting_entities` instead of parse_mode.
+
+    Text is sent as-is, so notifier and token names can no longer be mangled
+    by Markdown characters they happen to contain.
+    """
+    __slots__ = ("footer", "links")
+
+    def __init__(self, referral_bots=REFERRAL_BOTS, header=REFERRAL_HEADER):
+        """
+        Args:
+            referral_bots (Iterable[tuple[str, str]]): (label, URL template) pairs;
+                CA_PLACEHOLDER in a URL is replaced with the contract address.
+            header (str): Line shown above the referral links.
+        """
+        footer = f"\n\n{header}\n"
+        links = []
+        for index, (label, url) in enumerate(referral_bots):
+            if index:
+                footer += " | "
+            # (offset within the footer, length, URL before the CA, URL after the CA)
+            head, _, tail = url.partition(CA_PLACEHOLDER)
+            links.append((utf16_length(footer), utf16_length(label), head, tail))
+            footer += label
+        self.footer = footer
+        self.links = tuple(links)
+
+    def render(self, notifier, contract_address, token_name=None, market_cap=None):
+        """
+        Build the text and entities of one forward.
+
+        Args:
+            notifier (str): The notifier line of the source group.
+            contract_address (str): The CA, spliced into the text and every referral URL.
+            token_name (str, optional): Token name line, omitted if empty.
+            market_cap (str, optional): Raw market cap, shown rounded to thousands if present.
+
+        Returns:
+            tuple[str, list[MessageEntityTextUrl]]: The message text and its link entities.
+        """
+        body = f"{notifier}\n\n"
+        if token_name:
+            body += f"{token_name}\n"
+        if market_cap:
+            body += f"MC: {round_to_k(market_cap)}\n"
+        if token_name or market_cap:
+            body += "\n"
+        body += contract_address
+
+        base = utf16_length(body)
+        entities = [
+            MessageEntityTextUrl(base + offset, length, f"{head}{contract_address}{tail}")
+            for offset, length, head, tail in self.links
+        ]
+        return body + self.footer, entities
+
+
+# Compiled from the configured referral bots at import
+forward_template = ForwardTemplate()
@@ -0,0 +1,113 @@
+from collections import namedtuple
+from .constants import FORWARD_TO
+
+# Everything needed to forward a call from one source chat for one user
+Subscriber = namedtuple("Subscriber", ["user_id", "notifier", "notifier_key", "destinations", "exempt"])
+
+# One chat a call is delivered to; kind is one of the DESTINATION_* values
+Destination = namedtuple("Destination", ["kind", "chat_id"])
+
+DEFAULT_NOTIFIER = "Insider Play"
+DEFAULT_NOTIFIER_KEY = "1"
+
+DESTINATION_DM = "dm"
+DESTINATION_GROUP = "group"
+DESTINATION_TRADING_BOT = "trading_bot"
+
+
+def user_destinations(user):
+    """
+    Resolve the chats a user's calls are delivered to.
+
+    Args:
+        user (dict): User document with optional destination_group_id,
+            trading_bot_id and forward_to (list of DESTINATION_* kinds) fields.
+
+    Returns:
+        tuple[Destination]: Destinations in forward_to order, skipping kinds that are
+            not set up and chats already listed; the user's DM if nothing else is left.
+    """
+    chat_ids = {
+        DESTINATION_DM: user["_id"],
+        DESTINATION_GROUP: user.get("destination_group_id"),
+        DESTINATION_TRADING_BOT: user.get("trading_bot_id"),
+    }
+    destinations = []
+    seen = set()
+    for kind in user.get("forward_to") or FORWARD_TO:
+        chat_id = chat_ids.get(kind)
+        if chat_id is None or int(chat_id) in seen:
+            continue
+        seen.add(int(chat_id))
+        destinations.append(Destination(kind, int(chat_id)))
+    return tuple(destinations) or (Destination(DESTINATION_DM, int(user["_id"])),)
+
+
+class RoutingIndex:
+    """
+    Source chat -> subscriber index built from group_configs.
+
+    Each user client holds a reference to its own `{chat_id: Subscriber}` map,
+    which is rebuilt in place, so a message from an unwatched chat costs a
+    single dict miss before any text is touched.
+    """
+
+    def __init__(self):
+        self._by_user = {}
+
+    def build(self, group_configs, users):
+        """
+        Rebuild the index from group config and user documents.
+
+        Args:
+            group_configs (list[dict]): Documents with user_id, group_id, notifier,
+                notifier_key and optional exempt and active fields.
+            users (list[dict]): User documents with the fields read by user_destinations.
+        """
+        destinations = {user["_id"]: user_destinations(user) for user in users}
+
+        by_user = {}
+        for group in group_configs:
+            # Groups toggled off in the admin bot are not routed
+            if not group.get("active", True):
+                continue
+            user_id = group["user_id"]
+            chat_id = int(group["group_id"])
+            subscriber = Subscriber(
+                user_id,
+                group.get("notifier") or DEFAULT_NOTIFIER,
+                group.get("notifier_key") or DEFAULT_NOTIFIER_KEY,
+                destinations.get(user_id) or user_destinations({"_id": user_id}),
+                bool(group.get("exempt", False)),
+            )
+            by_user.setdefault(user_id, {})[chat_id] = subscriber
+
+        # Update existing per-user maps in place so handlers keep valid references
+        for user_id, routes in self._by_user.items():
+            routes.clear()
+            routes.update(by_user.pop(user_id, {}))
+        self._by_user.update(by_user)
+
+    def for_user(self, user_id):
+        """
+        Get the live route map for one user's client.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            dict: Mapping of integer chat IDs to Subscriber entries; updated in place on rebuild.
+        """
+        return self._by_user.setdefault(user_id, {})
+
+    def chat_ids(self, user_id):
+        """
+        List the source chats a user watches.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            list[int]: The watched chat IDs.
+        """
+        return list(self._by_user.get(user_id, ()))
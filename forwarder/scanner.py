@@ -0,0 +1,56 @@
+import re
+from collections import namedtuple
+from .constants import SOLANA_ADDRESS_PATTERN
+
+# A contract address found in a message, tagged with where it came from
+LinkMatch = namedtuple("LinkMatch", ["address", "source"])
+
+# Source types reported by scan_links
+SOURCE_LABELED = "labeled"
+SOURCE_PUMPFUN = "pumpfun"
+SOURCE_DEXSCREENER = "dexscreener"
+SOURCE_BIRDEYE = "birdeye"
+SOURCE_ADDRESS = "address"
+
+# How strongly each source marks an address as the call's CA, lowest first: an explicit
+# "CA:" label, then a token link, then a bare address, which may as well be a wallet
+SOURCE_RANK = {
+    SOURCE_LABELED: 0,
+    SOURCE_PUMPFUN: 1,
+    SOURCE_DEXSCREENER: 1,
+    SOURCE_BIRDEYE: 1,
+    SOURCE_ADDRESS: 2,
+}
+
+_ADDRESS_END = r"(?![A-Za-z0-9])"
+
+# One alternation over every supported form; the named group that matched is the source type
+LINK_PATTERN = re.compile(
+    rf"(?i:\b(?:CA|Contract|Address)[ \t]*:[ \t]*)(?P<{SOURCE_LABELED}>{SOLANA_ADDRESS_PATTERN}){_ADDRESS_END}"
+    rf"|(?i:pump\.fun/(?:coin/)?)(?P<{SOURCE_PUMPFUN}>{SOLANA_ADDRESS_PATTERN}){_ADDRESS_END}"
+    rf"|(?i:dexscreener\.com/solana/)(?P<{SOURCE_DEXSCREENER}>{SOLANA_ADDRESS_PATTERN}){_ADDRESS_END}"
+    rf"|(?i:birdeye\.so/token/)(?P<{SOURCE_BIRDEYE}>{SOLANA_ADDRESS_PATTERN}){_ADDRESS_END}"
+    rf"|(?<![A-Za-z0-9])(?P<{SOURCE_ADDRESS}>{SOLANA_ADDRESS_PATTERN}){_ADDRESS_END}"
+)
+
+
+def scan_links(text):
+    """
+    Find contract addresses after a CA label, in pump.fun, dexscreener and
+    birdeye links and as bare base58 tokens with a single pass over the text.
+
+    Args:
+        text (str): The raw message text.
+
+    Returns:
+        list[LinkMatch]: Unique addresses in order of first appearance, each tagged
+            with the best-ranked source it appeared in.
+    """
+    found = {}
+    for match in LINK_PATTERN.finditer(text):
+        source = match.lastgroup
+        address = match.group(source)
+        seen = found.get(address)
+        if seen is None or SOURCE_RANK[source] < SOURCE_RANK[seen]:
+            found[address] = source
+    return [LinkMatch(address, source) for address, source in found.items()]
@@ -0,0 +1,55 @@
+import bisect
+import hashlib
+from .constants import SHARD_RING_REPLICAS
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping user IDs to worker shards.
+
+    Each shard owns `replicas` points on the ring, so users spread evenly and
+    changing the shard count only moves about 1/N of them. The hash is stable
+    across processes and restarts, so the supervisor and every worker agree
+    on who owns a user without talking to each other.
+    """
+
+    def __init__(self, shards, replicas=SHARD_RING_REPLICAS):
+        """
+        Args:
+            shards (int): Number of worker shards.
+            replicas (int, optional): Ring points per shard.
+        """
+        self.shards = shards
+        points = sorted((_hash(f"shard-{shard}-{replica}"), shard) for shard in range(shards) for replica in range(replicas))
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, user_id):
+        """
+        Find the shard that owns a user.
+
+        Args:
+            user_id (int): The Telegram user ID.
+
+        Returns:
+            int: The shard index, in range(shards).
+        """
+        index = bisect.bisect(self._points, _hash(f"user-{user_id}")) % len(self._points)
+        return self._owners[index]
+
+    def owns(self, shard, user_id):
+        """
+        Check whether a shard owns a user.
+
+        Args:
+            shard (int): The shard index.
+            user_id (int): The Telegram user ID.
+
+        Returns:
+            bool: True if the user belongs to the shard.
+        """
+        return self.shard_for(user_id) == shard
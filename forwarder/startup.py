@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from .constants import CLIENT_START_CONCURRENCY, CLIENT_START_TIMEOUT
+
+
+async def connect_client(client, timeout=CLIENT_START_TIMEOUT):
+    """
+    Connect a client without ever prompting for a phone number or code.
+
+    Args:
+        client (telethon.TelegramClient): The client to connect.
+        timeout (float, optional): Seconds to wait for the connection and authorization check.
+
+    Returns:
+        str: None if the client is connected and authorized, otherwise why it was skipped.
+    """
+    try:
+        await asyncio.wait_for(client.connect(), timeout)
+        if await asyncio.wait_for(client.is_user_authorized(), timeout):
+            return None
+        reason = "session is not authorized"
+    except asyncio.TimeoutError:
+        reason = f"no connection after {timeout}s"
+    except Exception as e:
+        reason = f"connection failed: {e}"
+    await _disconnect(client)
+    return reason
+
+
+async def _disconnect(client):
+    # A skipped client must never take the other users' startup down with it
+    try:
+        await client.disconnect()
+    except Exception as e:
+        logging.warning(f"Error disconnecting a skipped client: {e}")
+
+
+async def start_clients(users, make_client, on_ready, limit=CLIENT_START_CONCURRENCY, timeout=CLIENT_START_TIMEOUT):
+    """
+    Connect every user's client concurrently, at most `limit` at a time.
+
+    Each client is handed to `on_ready` as soon as it is authorized, so the
+    first accounts listen while the rest are still connecting. Unauthorized
+    or unreachable sessions are skipped and reported instead of blocking the
+    accounts after them.
+
+    Args:
+        users (list[dict]): User documents to start clients for.
+        make_client (Callable[[dict], telethon.TelegramClient]): Builds a user's client.
+        on_ready (Callable[[telethon.TelegramClient, dict], None]): Called with each authorized client.
+        limit (int, optional): Maximum concurrent connection attempts.
+        timeout (float, optional): Seconds each connection attempt may take.
+
+    Returns:
+        tuple[list, dict]: The started clients, and skipped user IDs mapped to the reason.
+    """
+    semaphore = asyncio.Semaphore(limit)
+    clients = []
+    skipped = {}
+
+    async def start(user):
+        async with semaphore:
+            try:
+                client = make_client(user)
+            except Exception as e:
+                skipped[user["_id"]] = f"client could not be created: {e}"
+                return
+            reason = await connect_client(client, timeout)
+        if reason is None:
+            try:
+                on_ready(client, user)
+                clients.append(client)
+                return
+            except Exception as e:
+                reason = f"client could not be set up: {e}"
+                await _disconnect(client)
+        skipped[user["_id"]] = reason
+        logging.warning(f"Skipping user {user['_id']}: {reason}.")
+
+    results = await asyncio.gather(*(start(user) for user in users), return_exceptions=True)
+    for user, result in zip(users, results):
+        if isinstance(result, Exception):
+            skipped[user["_id"]] = f"startup failed: {result}"
+            logging.error(f"Error starting user {user['_id']}: {result}")
+    return clients, skipped
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs, urlsplit
+from .connection import STATE_CONNECTED, client_health
+from .constants import STATS_HOST, STATS_PORT
+from .dedupe import forwarded_cas
+from .extraction import extraction_cache
+from .metrics import latency_metrics
+from .outbox import outboxes
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Outbox counters exported per user: (stats key, metric name, type, help)
+OUTBOX_METRICS = (
+    ("depth", "forwarder_outbox_depth", "gauge", "Messages waiting in the user's outbox."),
+    ("sent", "forwarder_outbox_sent_total", "counter", "Messages acked by Telegram."),
+    ("retries", "forwarder_outbox_retries_total", "counter", "Send retries after errors or FloodWaits."),
+    ("flood_waits", "forwarder_outbox_flood_waits_total", "counter", "FloodWaitErrors received."),
+    ("dropped", "forwarder_outbox_dropped_total", "counter", "Messages dropped after the retry budget."),
+    ("wait_max", "forwarder_outbox_wait_max_seconds", "gauge", "Longest queue wait before a first send attempt."),
+)
+
+# Client connection health exported per user: (health key, metric name, type, help)
+CLIENT_METRICS = (
+    ("idle_seconds", "forwarder_client_idle_seconds", "gauge", "Seconds since the client's last update."),
+    ("reconnects", "forwarder_client_reconnects_total", "counter", "Reconnections after a drop or stall."),
+    ("stalls", "forwarder_client_stalls_total", "counter", "Times no update arrived within the stall window."),
+)
+
+
+# Process-wide cache and dedupe counters: (source, stats key, metric name, type, help)
+PROCESS_METRICS = (
+    ("extraction", "entries", "forwarder_extraction_cache_entries", "gauge", "Messages in the extraction cache."),
+    ("extraction", "hits", "forwarder_extraction_cache_hits_total", "counter", "Extraction cache hits."),
+    ("extraction", "misses", "forwarder_extraction_cache_misses_total", "counter", "Extraction cache misses."),
+    ("dedupe", "entries", "forwarder_dedupe_entries", "gauge", "Contract addresses remembered across all scopes."),
+    ("dedupe", "expired", "forwarder_dedupe_expired_total", "counter", "Dedupe entries dropped after the TTL."),
+    ("dedupe", "evicted", "forwarder_dedupe_evicted_total", "counter", "Dedupe entries dropped over capacity."),
+    ("dedupe", "approx_bytes", "forwarder_dedupe_bytes", "gauge", "Approximate memory of the dedupe store."),
+)
+
+# Bloom front counters, exported only when DEDUPE_BLOOM is on: (stats key, metric name, type, help)
+BLOOM_METRICS = (
+    ("bytes", "forwarder_dedupe_bloom_bytes", "gauge", "Memory of the dedupe Bloom filter pair."),
+    ("items", "forwarder_dedupe_bloom_items", "gauge", "Entries in the dedupe Bloom filter pair."),
+    ("estimated_fp_rate", "forwarder_dedupe_bloom_fp_rate", "gauge", "Estimated false-positive rate of the Bloom filter."),
+    ("rotations", "forwarder_dedupe_bloom_rotations_total", "counter", "Bloom filter rotations."),
+)
+
+
+def process_stats():
+    """
+    Collect the process-wide extraction cache and dedupe store stats.
+
+    Returns:
+        dict: "extraction" and "dedupe" stats dicts.
+    """
+    return {"extraction": extraction_cache.stats(), "dedupe": forwarded_cas.stats()}
+
+
+def _summary_lines(name, help_text, label, histograms):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+    for (stage, owner), histogram in sorted(histograms.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+        labels = f'stage="{stage}",{label}="{owner}"'
+        for q in QUANTILES:
+            lines.append(f'{name}{{{labels},quantile="{q}"}} {histogram.quantile(q):.6f}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def render_prometheus():
+    """
+    Render every latency histogram and outbox counter in the Prometheus text format.
+
+    Returns:
+        str: The exposition text.
+    """
+    lines = _summary_lines(
+        "forwarder_user_stage_latency_seconds", "Call stage latency per user.", "user", latency_metrics.by_user
+    )
+    lines += _summary_lines(
+        "forwarder_group_stage_latency_seconds", "Call stage latency per source group.", "group", latency_metrics.by_group
+    )
+    stats = {user_id: outbox.stats() for user_id, outbox in outboxes.items()}
+    for key, name, kind, help_text in OUTBOX_METRICS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{user="{user_id}"}} {user_stats[key]}' for user_id, user_stats in stats.items()]
+    process = process_stats()
+    for source, key, name, kind, help_text in PROCESS_METRICS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {process[source][key]}"]
+    bloom = process["dedupe"]["bloom"]
+    if bloom is not None:
+        for key, name, kind, help_text in BLOOM_METRICS:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {bloom[key]}"]
+    health = {user_id: user_health.as_dict() for user_id, user_health in client_health.items()}
+    lines += ["# HELP forwarder_client_up Whether the client is connected.", "# TYPE forwarder_client_up gauge"]
+    for user_id, user_health in health.items():
+        lines.append(f'forwarder_client_up{{user="{user_id}"}} {int(user_health["state"] == STATE_CONNECTED)}')
+    for key, name, kind, help_text in CLIENT_METRICS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{user="{user_id}"}} {user_health[key]}' for user_id, user_health in health.items()]
+    return "\n".join(lines) + "\n"
+
+
+def render_stats(user_id=None):
+    """
+    Summarize stage latencies, outbox counters, client health and the process-wide
+    cache and dedupe stats as JSON for the admin bot.
+
+    Args:
+        user_id (int, optional): Only include this user. Defaults to every user.
+
+    Returns:
+        str: JSON with "stages" (stage -> count, max, p50, p99 in seconds), "outbox",
+            "clients" (user ID -> connection health), "extraction" and "dedupe".
+    """
+    if user_id is None:
+        outbox_stats = [outbox.stats() for outbox in outboxes.values()]
+        health = client_health
+    else:
+        outbox_stats = [outboxes[user_id].stats()] if user_id in outboxes else []
+        health = {user_id: client_health[user_id]} if user_id in client_health else {}
+    totals = {key: sum(stats[key] for stats in outbox_stats) for key in ("depth", "sent", "retries", "flood_waits", "dropped")}
+    clients = {str(health_user_id): user_health.as_dict() for health_user_id, user_health in health.items()}
+    return json.dumps({
+        "stages": latency_metrics.summary(user_id),
+        "outbox": totals,
+        "clients": clients,
+        **process_stats(),
+    })
+
+
+async def _handle(reader, writer):
+    try:
+        request_line = await reader.readline()
+        # Drain the headers; the request body is never used
+        while (await reader.readline()).strip():
+            pass
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        url = urlsplit(target)
+        if method != "GET":
+            status, content_type, body = "405 Method Not Allowed", "text/plain", "GET only\n"
+        elif url.path == "/metrics":
+            status, content_type, body = "200 OK", PROMETHEUS_CONTENT_TYPE, render_prometheus()
+        elif url.path == "/stats":
+            user = parse_qs(url.query).get("user")
+            status, content_type, body = "200 OK", "application/json", render_stats(int(user[0]) if user else None)
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", "Not found\n"
+        payload = body.encode()
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+    except Exception as e:
+        logging.error(f"Error serving stats request: {e}")
+    finally:
+        writer.close()
+
+
+async def serve_stats(host=STATS_HOST, port=STATS_PORT):
+    """
+    Serve /metrics (Prometheus) and /stats (JSON) over HTTP until cancelled.
+
+    Stats are not worth stopping forwarding for, so a port that cannot be
+    bound (e.g. still held by a restarting worker) is only logged.
+
+    Args:
+        host (str, optional): Interface to bind; local only by default.
+        port (int, optional): TCP port.
+    """
+    try:
+        server = await asyncio.start_server(_handle, host, port)
+    except OSError as e:
+        logging.error(f"Could not serve forwarder metrics on {host}:{port}: {e}")
+        return
+    logging.info(f"Serving forwarder metrics on http://{host}:{port}/metrics")
+    async with server:
+        await server.serve_forever()
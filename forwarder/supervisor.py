@@ -0,0 +1,121 @@
+"""
+Sharded forwarder: a supervisor process running one forwarder worker per
+shard. Users are split across workers by consistent hash of their ID.
+
+Run from the repository root:
+    python -m forwarder.supervisor --workers 4
+"""
+import sys
+import time
+import signal
+import asyncio
+import logging
+import argparse
+from .constants import SHARD_RESTART_BACKOFF, SHARD_RESTART_BACKOFF_MAX, SHARD_STOP_TIMEOUT, SHARD_WORKERS
+
+
+class Supervisor:
+    """
+    Starts one `forwarder.main --shard N` process per shard and restarts any
+    that exit with a growing backoff. Each worker picks up users joining or
+    leaving its shard on its own.
+    """
+
+    def __init__(
+        self,
+        workers=SHARD_WORKERS,
+        backoff=SHARD_RESTART_BACKOFF,
+        backoff_max=SHARD_RESTART_BACKOFF_MAX,
+        stop_timeout=SHARD_STOP_TIMEOUT,
+    ):
+        """
+        Args:
+            workers (int, optional): Number of worker processes (shards).
+            backoff (float, optional): First delay before restarting a crashed worker.
+            backoff_max (float, optional): Longest restart delay; a worker that stayed up
+                this long is considered healthy again.
+            stop_timeout (float, optional): Seconds a worker may take to exit after SIGTERM
+                before it is killed.
+        """
+        self.workers = workers
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.stop_timeout = stop_timeout
+        self.restarts = [0] * workers
+        self._processes = [None] * workers
+        self._stopping = False
+
+    def command(self, shard):
+        """
+        Build the command line of one worker.
+
+        Args:
+            shard (int): The shard index.
+
+        Returns:
+            list[str]: The worker's argv.
+        """
+        return [sys.executable, "-m", "forwarder.main", "--shard", str(shard), "--shards", str(self.workers)]
+
+    async def _watch(self, shard):
+        delay = self.backoff
+        while not self._stopping:
+            process = await asyncio.create_subprocess_exec(*self.command(shard))
+            self._processes[shard] = process
+            started = time.monotonic()
+            logging.info(f"Started worker {shard} (pid {process.pid}).")
+            code = await process.wait()
+            if self._stopping:
+                return
+            uptime = time.monotonic() - started
+            if uptime >= self.backoff_max:
+                delay = self.backoff
+            logging.warning(f"Worker {shard} exited with code {code} after {uptime:.0f}s; restarting in {delay}s.")
+            self.restarts[shard] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.backoff_max)
+
+    async def run(self):
+        """
+        Run every worker until cancelled, SIGTERM or SIGINT.
+        """
+        # Stop the workers with the supervisor, or a restart would run two forwarders per shard
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, task.cancel)
+        try:
+            await asyncio.gather(*(self._watch(shard) for shard in range(self.workers)))
+        finally:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(signum)
+            await self.stop()
+
+    async def _terminate(self, shard, process):
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), self.stop_timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Worker {shard} did not exit within {self.stop_timeout}s; killing it.")
+            process.kill()
+            await process.wait()
+
+    async def stop(self):
+        """
+        Terminate every worker, kill any that outlive the stop timeout, and wait for them to exit.
+        """
+        self._stopping = True
+        running = [
+            (shard, process)
+            for shard, process in enumerate(self._processes)
+            if process is not None and process.returncode is None
+        ]
+        await asyncio.gather(*(self._terminate(shard, process) for shard, process in running))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Run the forwarder as sharded worker processes.")
+    parser.add_argument("--workers", type=int, default=SHARD_WORKERS, help="number of worker processes")
+    args = parser.parse_args()
+    asyncio.run(Supervisor(args.workers).run())
@@ -0,0 +1,69 @@
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Solana public keys are raw ed25519 keys
+ADDRESS_LENGTH = 32
+
+# Translation table that deletes every base58 character; anything left over is invalid
+_STRIP_BASE58 = str.maketrans("", "", BASE58_ALPHABET)
+
+# Byte translation table mapping each base58 character to its digit value
+_BASE58_DIGITS = bytes.maketrans(BASE58_ALPHABET.encode(), bytes(range(58)))
+
+
+def decode_address(address):
+    """
+    Decode a base58 Solana address into its raw bytes.
+
+    Args:
+        address (str): The candidate address.
+
+    Returns:
+        bytes: The 32 decoded bytes, or None if the string is not a valid address.
+    """
+    if not 32 <= len(address) <= 44 or address.translate(_STRIP_BASE58):
+        return None
+
+    value = 0
+    for digit in address.encode().translate(_BASE58_DIGITS):
+        value = value * 58 + digit
+
+    # Each leading '1' encodes a leading zero byte
+    leading_zeros = len(address) - len(address.lstrip("1"))
+    body_length = (value.bit_length() + 7) // 8
+    if leading_zeros + body_length != ADDRESS_LENGTH:
+        return None
+    return value.to_bytes(ADDRESS_LENGTH, "big")
+
+
+def is_valid_address(address):
+    """
+    Check whether a string is a base58-encoded 32-byte Solana address.
+
+    Args:
+        address (str): The candidate address.
+
+    Returns:
+        bool: True if the address is well formed.
+    """
+    return decode_address(address) is not None
+
+
+def filter_valid_addresses(candidates):
+    """
+    Validate many candidates from one message at once.
+
+    Args:
+        candidates (Iterable[str]): Candidate addresses, possibly with duplicates.
+
+    Returns:
+        list[str]: The valid, unique addresses in their original order.
+    """
+    seen = set()
+    valid = []
+    for candidate in candidates:
+        if candidate in seen:
+            continue
+        seen.add(candidate)
+        if decode_address(candidate) is not None:
+            valid.append(candidate)
+    return valid
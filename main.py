@@ -5,6 +5,7 @@ from admin.config import API_TOKEN
 from admin.handlers.login import register_login_handlers
 from admin.handlers.groups import register_group_handlers
 from admin.handlers.commands import register_command_handlers
+from admin.utils.sessions import session_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,7 +29,9 @@ async def set_bot_commands():
         BotCommand(command="/set_destination", description="Set a destination group"),
         BotCommand(command="/set_notifier", description="Assign a notifier to a group"),
         BotCommand(command="/tradingbot", description="Set up a trading bot"),
+        BotCommand(command="/forward_to", description="Choose where calls are sent"),
         BotCommand(command="/view_config", description="View your configuration"),
+        BotCommand(command="/stats", description="Show forwarding latency"),
         BotCommand(command="/reset_config", description="Reset your configuration"),
     ]
     await bot.set_my_commands(commands)
@@ -43,6 +46,13 @@ async def on_startup(dispatcher: Dispatcher):
     logger.info("Bot commands set successfully.")
 
 
+async def on_shutdown(dispatcher: Dispatcher):
+    """
+    Perform shutdown tasks such as writing pending Telethon sessions.
+    """
+    await session_store.close()
+
+
 def main():
     """
     Main function to start the bot.
@@ -53,7 +63,7 @@ def main():
     register_command_handlers(dp)
 
     # Start polling
-    executor.start_polling(dp, on_startup=on_startup, skip_updates=True)
+    executor.start_polling(dp, on_startup=on_startup, on_shutdown=on_shutdown, skip_updates=True)
 
 
 if __name__ == "__main__":
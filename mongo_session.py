@@ -1,20 +1,169 @@
-from telethon.sessions import MemorySession
+import asyncio
+import logging
+from telethon.sessions import StringSession
+from repository import load_session, load_sessions, save_sessions
 
-class MongoSession(MemorySession):
-    def __init__(self, user_id, db):
-        super().__init__()
+# Seconds a session write is held back so a burst of Telethon save() calls becomes one upsert
+SESSION_FLUSH_DELAY = 2
+
+
+class SessionStore:
+    """
+    Coalesced MongoDB writes for every open MongoSession.
+
+    Telethon calls `save()` on auth key, DC and update-state changes, often
+    several times in a row. Each call only marks its session dirty; a
+    debounce timer (and `close` on shutdown) then writes every dirty session
+    in one bulk upsert. Sessions are serialized at flush time, so the newest
+    state always wins and writes never land out of order.
+    """
+
+    def __init__(self, delay=SESSION_FLUSH_DELAY):
+        """
+        Args:
+            delay (float, optional): Seconds between the first unsaved change and the flush.
+        """
+        self.delay = delay
+        self.flushes = 0
+        self._dirty = {}
+        self._timer = None
+        self._lock = asyncio.Lock()
+
+    def mark_dirty(self, session):
+        """
+        Queue a session for the next flush.
+
+        Args:
+            session (MongoSession): The changed session.
+        """
+        self._dirty[session.user_id] = session
+        self._schedule()
+
+    def _schedule(self):
+        if self._timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop yet; the session is written by the next flush or close
+            return
+        self._timer = loop.call_later(self.delay, lambda: asyncio.ensure_future(self.flush()))
+
+    def discard(self, user_id):
+        """
+        Drop a session's unsaved changes, e.g. on logout, so a late flush cannot restore it.
+
+        Args:
+            user_id (int): The Telegram user ID.
+        """
+        self._dirty.pop(user_id, None)
+
+    async def flush(self):
+        """
+        Write every dirty session in one bulk upsert.
+
+        Returns:
+            int: The number of sessions written.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            if not dirty:
+                return 0
+            try:
+                await save_sessions({user_id: session.save_to_string() for user_id, session in dirty.items()})
+            except Exception as e:
+                logging.error(f"Error saving {len(dirty)} Telethon sessions: {e}")
+                # Retry later, unless the session was discarded or changed again meanwhile
+                for user_id, session in dirty.items():
+                    self._dirty.setdefault(user_id, session)
+                self._schedule()
+                return 0
+            self.flushes += 1
+            return len(dirty)
+
+    async def load(self, user_id):
+        """
+        Restore one user's session.
+
+        Args:
+            user_id (int): The Telegram user ID.
+
+        Returns:
+            MongoSession: The restored (or empty) session.
+        """
+        return MongoSession(user_id, await load_session(user_id), self)
+
+    async def load_many(self, user_ids):
+        """
+        Restore the sessions of many users, e.g. a shard at startup, in one query.
+
+        Args:
+            user_ids (list[int]): The Telegram user IDs.
+
+        Returns:
+            dict[int, MongoSession]: Sessions keyed by user ID; users without stored data are absent.
+        """
+        stored = await load_sessions(user_ids)
+        return {user_id: MongoSession(user_id, session_data, self) for user_id, session_data in stored.items()}
+
+    async def close(self):
+        """
+        Write any pending changes; call before the event loop stops.
+        """
+        await self.flush()
+
+
+class MongoSession(StringSession):
+    """
+    A Telethon session stored in MongoDB through a SessionStore.
+
+    Use `await MongoSession.create(user_id)`, or `session_store.load_many` for
+    many users, so the stored session is loaded without blocking the event loop.
+    """
+
+    def __init__(self, user_id, session_data=None, store=None):
+        """
+        Args:
+            user_id (int): The Telegram user ID.
+            session_data (str, optional): Serialized session data to restore.
+            store (SessionStore, optional): Where changes are written; defaults to `session_store`.
+        """
+        super().__init__(session_data)
         self.user_id = user_id
-        self.collection = db["telethon_sessions"]
-        self.load()
+        self.store = store or session_store
 
-    def load(self):
-        session_data = self.collection.find_one({"_id": self.user_id})
-        if session_data:
-            self.unpack(session_data["session"])  # Load the session data
+    @classmethod
+    async def create(cls, user_id):
+        """
+        Load the session data from MongoDB, if it exists, and build the session.
+
+        Args:
+            user_id (int): The Telegram user ID.
+
+        Returns:
+            MongoSession: The restored (or empty) session.
+        """
+        return await session_store.load(user_id)
 
     def save(self):
-        session_data = {
-            "_id": self.user_id,
-            "session": self.save_to_string()  # Save the session as a string
-        }
-        self.collection.update_one({"_id": self.user_id}, {"$set": session_data}, upsert=True)
+        """
+        Queue the session for the store's next coalesced write.
+
+        Telethon calls this on every state change; nothing is written here.
+        """
+        self.store.mark_dirty(self)
+
+    def save_to_string(self):
+        """
+        Serialize the session data to a string format.
+
+        Returns:
+            str: Serialized session data.
+        """
+        return super().save()
+
+
+session_store = SessionStore()
@@ -0,0 +1,258 @@
+import os
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+# Load environment variables
+load_dotenv()
+MONGO_URI = os.getenv("MONGO_URI")
+
+# Connect to MongoDB (Motor binds to the running event loop on first use)
+mongo_client = AsyncIOMotorClient(MONGO_URI)
+db = mongo_client['kaoru']
+
+# Collections
+users_collection = db['users']
+group_configs_collection = db['group_configs']
+sessions_collection = db['sessions']
+meta_collection = db['meta']
+forwarded_cas_collection = db['forwarded_cas']
+
+# Version document polled by the forwarder's config cache
+CONFIG_VERSION_ID = "config_version"
+
+
+# Users
+
+async def get_user(user_id: int, fields=None) -> dict:
+    """
+    Fetch a user document.
+
+    Args:
+        user_id (int): The Telegram user ID.
+        fields (list, optional): Specific fields to fetch. Defaults to None.
+
+    Returns:
+        dict: The user document, or None if not found.
+    """
+    projection = {field: 1 for field in fields} if fields else None
+    return await users_collection.find_one({"_id": user_id}, projection)
+
+async def find_users(query: dict = None, fields=None) -> list:
+    """
+    Fetch every user matching a query in one round trip.
+
+    Args:
+        query (dict, optional): MongoDB filter. Defaults to all users.
+        fields (list, optional): Specific fields to fetch. Defaults to None.
+
+    Returns:
+        list[dict]: Matching user documents.
+    """
+    projection = {field: 1 for field in fields} if fields else None
+    return await users_collection.find(query or {}, projection).to_list(None)
+
+async def get_or_create_user(user_id: int, username: str = None) -> dict:
+    """
+    Retrieve an existing user from the database or create a new one if not found.
+
+    Args:
+        user_id (int): The Telegram user ID.
+        username (str): Optional username to set or update.
+
+    Returns:
+        dict: User document from MongoDB.
+    """
+    user = await users_collection.find_one({"_id": user_id})
+    if not user:
+        user = {
+            "_id": user_id,
+            "username": username,
+            "source_group_ids": [],
+            "destination_group_id": None,
+            "trading_bot_id": None,
+        }
+        await users_collection.insert_one(user)
+    elif username and user.get("username") != username:
+        await users_collection.update_one(
+            {"_id": user_id}, {"$set": {"username": username}}
+        )
+        user["username"] = username
+    return user
+
+async def update_user(user_id: int, updates: dict, upsert: bool = False):
+    """
+    Update a user's information and notify the forwarder.
+
+    Args:
+        user_id (int): The Telegram user ID.
+        updates (dict): Fields to update.
+        upsert (bool, optional): Create the user if missing. Defaults to False.
+    """
+    await users_collection.update_one({"_id": user_id}, {"$set": updates}, upsert=upsert)
+    await bump_config_version()
+
+async def delete_user_session(user_id: int):
+    """
+    Remove a user's session data from the database.
+
+    Args:
+        user_id (int): The Telegram user ID.
+    """
+    await users_collection.update_one({"_id": user_id}, {"$unset": {"session_name": "", "logged_in_at": ""}})
+    await sessions_collection.delete_one({"user_id": user_id})
+    await bump_config_version()
+
+
+# Group configs
+
+async def find_group_configs(query: dict = None) -> list:
+    """
+    Fetch group configuration documents in one round trip.
+
+    Args:
+        query (dict, optional): MongoDB filter. Defaults to all group configs.
+
+    Returns:
+        list[dict]: Matching group config documents.
+    """
+    return await group_configs_collection.find(query or {}).to_list(None)
+
+async def toggle_group_active(user_id: int, group_id: str) -> bool:
+    """
+    Flip whether a source group is forwarded for a user and notify the forwarder.
+
+    The current state is read from the user's own group config, so admins
+    never share state and a restart of the admin bot loses nothing.
+
+    Args:
+        user_id (int): The Telegram user ID.
+        group_id (str): The source group ID.
+
+    Returns:
+        bool: True if the group is now forwarded.
+    """
+    query = {"user_id": user_id, "group_id": group_id}
+    config = await group_configs_collection.find_one(query, {"active": 1})
+    # A group without a config is not forwarded yet, so its first toggle turns it on
+    active = config is None or not config.get("active", True)
+    await group_configs_collection.update_one(query, {"$set": {"active": active}}, upsert=True)
+    await bump_config_version()
+    return active
+
+
+# Config version
+
+async def bump_config_version():
+    """
+    Signal the forwarder that user or group configuration changed so it
+    reloads its in-memory config cache.
+    """
+    await meta_collection.update_one({"_id": CONFIG_VERSION_ID}, {"$inc": {"version": 1}}, upsert=True)
+
+async def get_config_version():
+    """
+    Fetch the config version published by the admin bot.
+
+    Returns:
+        The version value, or None if it was never written.
+    """
+    meta = await meta_collection.find_one({"_id": CONFIG_VERSION_ID})
+    return meta["version"] if meta else None
+
+
+# Sessions
+
+async def save_sessions(sessions: dict):
+    """
+    Upsert many Telethon session strings in one round trip.
+
+    Args:
+        sessions (dict): Serialized session data keyed by Telegram user ID.
+    """
+    if sessions:
+        await sessions_collection.bulk_write(
+            [
+                UpdateOne({"user_id": user_id}, {"$set": {"session_data": session_data}}, upsert=True)
+                for user_id, session_data in sessions.items()
+            ],
+            ordered=False
+        )
+
+async def load_session(user_id: int) -> str:
+    """
+    Load a Telethon session string from the database.
+
+    Args:
+        user_id (int): The Telegram user ID.
+
+    Returns:
+        str: Serialized session data or None if not found.
+    """
+    session_entry = await sessions_collection.find_one({"user_id": user_id})
+    return session_entry["session_data"] if session_entry else None
+
+async def load_sessions(user_ids: list) -> dict:
+    """
+    Load the Telethon session strings of many users in one query.
+
+    Args:
+        user_ids (list[int]): The Telegram user IDs.
+
+    Returns:
+        dict: Serialized session data keyed by user ID; users without a stored session are absent.
+    """
+    cursor = sessions_collection.find({"user_id": {"$in": list(user_ids)}}, {"user_id": 1, "session_data": 1})
+    return {entry["user_id"]: entry["session_data"] async for entry in cursor}
+
+
+# Forwarded contract addresses (dedupe state)
+
+async def bulk_write_forwarded_cas(operations: list):
+    """
+    Apply a batch of dedupe writes in one round trip.
+
+    Args:
+        operations (list): pymongo write operations (e.g. ReplaceOne).
+    """
+    if operations:
+        await forwarded_cas_collection.bulk_write(operations, ordered=False)
+
+async def find_live_forwarded_cas(now) -> list:
+    """
+    Fetch every dedupe entry that has not expired yet, oldest first.
+
+    Args:
+        now (datetime.datetime): The current UTC time.
+
+    Returns:
+        list[dict]: Documents with _id, scope, key and created_at.
+    """
+    cursor = forwarded_cas_collection.find(
+        {"expires_at": {"$gt": now}},
+        {"scope": 1, "key": 1, "created_at": 1},
+        batch_size=10000,
+    ).sort("created_at", 1)
+    return await cursor.to_list(None)
+
+async def claim_forwarded_ca(document: dict, now) -> bool:
+    """
+    Insert a dedupe entry unless a live one with the same _id exists.
+
+    Args:
+        document (dict): The entry, with _id and expires_at.
+        now (datetime.datetime): The current UTC time.
+
+    Returns:
+        bool: True if this call inserted the entry or replaced an expired one.
+    """
+    try:
+        await forwarded_cas_collection.insert_one(document)
+        return True
+    except DuplicateKeyError:
+        # The TTL monitor runs about once a minute; take over an entry it has not deleted yet
+        result = await forwarded_cas_collection.replace_one(
+            {"_id": document["_id"], "expires_at": {"$lte": now}}, document
+        )
+        return result.modified_count == 1
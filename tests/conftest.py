@@ -0,0 +1,20 @@
+import os
+import pytest
+
+# repository.py connects lazily; tests never reach a server but the client needs a URI
+if not os.environ.get("MONGO_URI"):
+    os.environ["MONGO_URI"] = "mongodb://localhost:1"
+
+
+class FakeClock:
+    """Time source that only moves when a test sets `now`."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,30 @@
+import asyncio
+import forwarder.config as config_module
+from forwarder.config import ConfigCache
+
+GROUPS = [
+    {"user_id": 1, "group_id": "-100123", "notifier": "caller"},
+    # Written by the legacy admin bot's set_notifier
+    {"_id": 2, "source_group_ids": ["-100456"]},
+    {"user_id": 3, "group_id": "@not_an_id"},
+]
+
+
+def test_malformed_group_configs_are_skipped(monkeypatch):
+    queries = []
+
+    async def find_group_configs(query=None):
+        queries.append(query)
+        return [dict(group) for group in GROUPS]
+
+    async def find_users(fields=None):
+        return [{"_id": 1}, {"_id": 2}, {"_id": 3}]
+
+    monkeypatch.setattr(config_module, "find_group_configs", find_group_configs)
+    monkeypatch.setattr(config_module, "find_users", find_users)
+
+    cache = ConfigCache()
+    asyncio.run(cache.load())
+    assert queries == [{"user_id": {"$exists": True}}]
+    assert list(cache.routing.for_user(1)) == [-100123]
+    assert cache.routing.for_user(2) == {} and cache.routing.for_user(3) == {}
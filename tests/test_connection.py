@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from telethon import TelegramClient, events
+from telethon.sessions import StringSession
+from telethon.tl.types import UpdateConfig
+from forwarder.connection import STATE_CONNECTED, ConnectionSupervisor
+
+STALL_TIMEOUT = 0.3
+
+
+class FakeTransport:
+    """Client double whose connection can drop with an error or stall silently."""
+    def __init__(self, refuse=0):
+        self.connects = 0
+        self.refuse = refuse
+        self.connected = True
+        self._disconnected = asyncio.get_running_loop().create_future()
+
+    async def connect(self):
+        self.connects += 1
+        if self.refuse:
+            self.refuse -= 1
+            raise OSError("connection refused")
+        self.connected = True
+        self._disconnected = asyncio.get_running_loop().create_future()
+
+    async def is_user_authorized(self):
+        return True
+
+    async def disconnect(self):
+        self.connected = False
+        if not self._disconnected.done():
+            self._disconnected.set_result(None)
+
+    @property
+    def disconnected(self):
+        return asyncio.shield(self._disconnected)
+
+    def drop(self):
+        self.connected = False
+        self._disconnected.set_exception(ConnectionResetError("connection reset by peer"))
+
+
+def make_supervisor(transport):
+    return ConnectionSupervisor(
+        transport, 1, stall_timeout=STALL_TIMEOUT, backoff=0.01, backoff_max=0.05, connect_timeout=1, rng=lambda: 0.5
+    )
+
+
+async def wait_for(condition, timeout=2):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+def test_touch_runs_as_a_telethon_raw_handler(caplog):
+    async def run():
+        client = TelegramClient(StringSession(), 1, "hash")
+        supervisor = ConnectionSupervisor(client, 1)
+        client.add_event_handler(supervisor.touch, events.Raw)
+        supervisor.health.last_update = -1.0
+        # Telethon awaits every handler and logs the ones that raise
+        await client._dispatch_update(UpdateConfig())
+        assert supervisor.health.last_update > 0
+
+    asyncio.run(run())
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+def test_dropped_connection_is_reconnected_with_backoff():
+    async def run():
+        transport = FakeTransport(refuse=2)
+        supervisor = make_supervisor(transport)
+        task = asyncio.ensure_future(supervisor.run())
+        await asyncio.sleep(0.01)
+        transport.drop()
+        await wait_for(lambda: supervisor.health.reconnects == 1)
+        # Two refused attempts before the third connects
+        assert transport.connects == 3
+        assert supervisor.health.state == STATE_CONNECTED
+        assert supervisor.health.last_error == "connection failed: connection refused"
+        task.cancel()
+
+    asyncio.run(run())
+
+
+def test_stalled_connection_is_forced_to_reconnect():
+    async def run():
+        transport = FakeTransport()
+        supervisor = make_supervisor(transport)
+        task = asyncio.ensure_future(supervisor.run())
+
+        # Updates keep arriving: no stall is flagged
+        for _ in range(10):
+            await supervisor.touch()
+            await asyncio.sleep(STALL_TIMEOUT / 5)
+        assert supervisor.health.stalls == 0 and transport.connects == 0
+
+        # The transport goes quiet without reporting a disconnect
+        await wait_for(lambda: supervisor.health.reconnects == 1)
+        assert supervisor.health.stalls == 1
+        assert supervisor.health.as_dict()["last_error"] == f"no updates for {STALL_TIMEOUT}s"
+        task.cancel()
+
+    asyncio.run(run())
@@ -0,0 +1,79 @@
+import asyncio
+from pymongo.errors import OperationFailure
+import db_indexes
+from db_indexes import INDEX_CONFLICT_CODES, audit_query_shapes
+
+
+class FakeCursor:
+    def __init__(self, winning_plan):
+        self.winning_plan = winning_plan
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": self.winning_plan}}
+
+
+class FakeCollection:
+    """Answers explain() with a canned plan per filter, like mongod would."""
+    def __init__(self, name, plans):
+        self.name = name
+        self.plans = plans
+
+    def find(self, query):
+        return FakeCursor(self.plans[repr(query)])
+
+
+INDEXED = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "user_id_1"}}
+COLLSCAN = {"stage": "COLLSCAN", "filter": {"user_id": {"$eq": 0}}}
+
+
+def test_audit_passes_when_every_query_uses_an_index():
+    collection = FakeCollection("group_configs", {repr({"user_id": 0}): INDEXED})
+    assert asyncio.run(audit_query_shapes([(collection, {"user_id": 0})])) == []
+
+
+def test_audit_reports_collection_scans():
+    collection = FakeCollection("sessions", {repr({"user_id": 0}): COLLSCAN, repr({"_id": 0}): INDEXED})
+    failures = asyncio.run(audit_query_shapes([(collection, {"user_id": 0}), (collection, {"_id": 0})]))
+    assert failures == ["sessions.find({'user_id': 0}) uses a collection scan"]
+
+
+def test_audit_finds_scans_nested_in_query_plan_and_or_branches():
+    # Newer servers wrap the plan in queryPlan; $or plans fan out into inputStages
+    plan = {"queryPlan": {"stage": "SUBPLAN", "inputStage": {"stage": "OR", "inputStages": [INDEXED, COLLSCAN]}}}
+    collection = FakeCollection("users", {repr({"_id": 0}): plan})
+    assert len(asyncio.run(audit_query_shapes([(collection, {"_id": 0})]))) == 1
+
+
+class IndexedCollection:
+    """Refuses create_index with a server error until its index is dropped."""
+    def __init__(self, name, code):
+        self.name = name
+        self.code = code
+        self.dropped = False
+
+    async def create_index(self, keys, **options):
+        if self.code and not (self.dropped and self.code in INDEX_CONFLICT_CODES):
+            raise OperationFailure("index build failed", self.code)
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+    async def drop_index(self, keys):
+        self.dropped = True
+
+
+def test_startup_reports_index_problems_without_dropping(monkeypatch):
+    conflicting = IndexedCollection("group_configs", 85)
+    duplicated = IndexedCollection("sessions", 11000)
+    monkeypatch.setattr(
+        db_indexes,
+        "REQUIRED_INDEXES",
+        [(conflicting, [("user_id", 1)], {}), (duplicated, [("user_id", 1)], {"unique": True})],
+    )
+    problems = asyncio.run(db_indexes.ensure_indexes())
+    assert len(problems) == 2 and not conflicting.dropped
+
+
+def test_standalone_rebuilds_changed_indexes(monkeypatch):
+    conflicting = IndexedCollection("group_configs", 85)
+    monkeypatch.setattr(db_indexes, "REQUIRED_INDEXES", [(conflicting, [("user_id", 1)], {"unique": True})])
+    assert asyncio.run(db_indexes.ensure_indexes(rebuild=True)) == []
+    assert conflicting.dropped
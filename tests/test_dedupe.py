@@ -0,0 +1,43 @@
+from forwarder.dedupe import DedupeStore
+
+KEY = bytes(32)
+
+
+def test_keys_are_scoped(clock):
+    store = DedupeStore(ttl=60, clock=clock)
+    assert store.add(KEY, scope=1)
+    assert not store.add(KEY, scope=1)
+    assert store.add(KEY, scope=2)
+    assert store.contains(KEY, 1) and not store.contains(KEY, 3)
+    assert store.stats()["scopes"] == 2
+
+
+def test_keys_expire_with_their_bucket(clock):
+    store = DedupeStore(ttl=60, buckets=6, clock=clock)
+    store.add(KEY)
+    clock.now = 65
+    assert store.contains(KEY)
+    clock.now = 71
+    assert not store.contains(KEY)
+    assert len(store) == 0 and store.expired == 1
+
+
+def test_oldest_bucket_is_evicted_over_capacity(clock):
+    store = DedupeStore(ttl=60, buckets=6, capacity=2, clock=clock)
+    store.add(b"a" * 32)
+    clock.now = 10
+    store.add(b"b" * 32)
+    store.add(b"c" * 32)
+    assert not store.contains(b"a" * 32)
+    assert store.contains(b"b" * 32) and store.contains(b"c" * 32)
+    assert store.evicted == 1
+
+
+def test_capacity_holds_within_one_bucket(clock):
+    store = DedupeStore(ttl=60, buckets=6, capacity=10, clock=clock)
+    keys = [bytes([i]) * 32 for i in range(50)]
+    for key in keys:
+        store.add(key)
+    assert len(store) == 10 and store.evicted == 40
+    assert not store.contains(keys[39])
+    assert all(store.contains(key) for key in keys[40:])
@@ -0,0 +1,84 @@
+import asyncio
+import sqlite3
+from forwarder.dedupe import DedupeStore
+from forwarder.dedupe_backends import SQLiteDedupeBackend
+
+TTL = 60
+SCOPE = -1001000000000
+
+
+def make_backend(path, clock):
+    return SQLiteDedupeBackend(str(path), DedupeStore(ttl=TTL, clock=clock), ttl=TTL, clock=clock)
+
+
+async def claim_everywhere(backends, key, scope=SCOPE):
+    return await asyncio.gather(*(backend.claim(key, scope) for backend in backends))
+
+
+def test_exactly_one_backend_wins_each_claim(tmp_path, clock):
+    async def run():
+        backends = [make_backend(tmp_path / "dedupe.sqlite3", clock) for _ in range(2)]
+        for backend in backends:
+            await backend.load()
+        try:
+            for i in range(50):
+                results = await claim_everywhere(backends, i.to_bytes(32, "big"))
+                assert sorted(results) == [False, True]
+            # Repeats are rejected from the local stores without a second winner
+            assert await claim_everywhere(backends, (0).to_bytes(32, "big")) == [False, False]
+            # Scopes are independent
+            assert True in await claim_everywhere(backends, (0).to_bytes(32, "big"), scope=SCOPE + 1)
+        finally:
+            for backend in backends:
+                await backend.close()
+
+    asyncio.run(run())
+
+
+def test_expired_claim_is_taken_over(tmp_path, clock):
+    async def run():
+        first = make_backend(tmp_path / "dedupe.sqlite3", clock)
+        second = make_backend(tmp_path / "dedupe.sqlite3", clock)
+        key = bytes(32)
+        try:
+            assert await first.claim(key, SCOPE)
+            assert not await second.claim(key, SCOPE)
+
+            # Past the TTL (and the local store's extra bucket) the row is overwritten
+            # through ON CONFLICT ... WHERE expires_at <= now
+            clock.now += 2 * TTL
+            assert await second.claim(key, SCOPE)
+            assert not first.claim_sync(key, SCOPE)
+
+            clock.now += 2 * TTL
+            assert first.purge_sync() == 1
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(run())
+
+
+def test_purge_survives_a_locked_database(tmp_path, clock):
+    async def run():
+        backend = make_backend(tmp_path / "dedupe.sqlite3", clock)
+        backend.purge_interval = 0.01
+        purges = []
+
+        def purge_sync():
+            purges.append(None)
+            if len(purges) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return 0
+
+        backend.purge_sync = purge_sync
+        task = asyncio.ensure_future(backend.run())
+        try:
+            while len(purges) < 3:
+                await asyncio.sleep(0.01)
+            assert not task.done()
+        finally:
+            task.cancel()
+            await backend.close()
+
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+from forwarder.extraction import TEMPLATES, extract_call, extract_contract
+from forwarder.scanner import SOURCE_ADDRESS, SOURCE_DEXSCREENER, SOURCE_LABELED, SOURCE_PUMPFUN, LinkMatch, scan_links
+from forwarder.validation import BASE58_ALPHABET, decode_address, filter_valid_addresses, is_valid_address
+
+GROUP_ID = -100123
+
+
+def encode(key):
+    value = int.from_bytes(key, "big")
+    digits = ""
+    while value:
+        value, digit = divmod(value, 58)
+        digits = BASE58_ALPHABET[digit] + digits
+    return "1" * (len(key) - len(key.lstrip(b"\0"))) + digits
+
+
+CA = encode(bytes(range(1, 33)))
+OTHER = encode(bytes([7]) * 32)
+CALL = f"Moon Token | @caller\nsome text\n💹MC: $123,456.78\nCA: {CA}"
+
+
+def test_addresses_decode_to_32_bytes():
+    assert decode_address(CA) == bytes(range(1, 33))
+    assert decode_address(encode(bytes(32))) == bytes(32)
+    # Too short, outside the alphabet, or decoding to the wrong length
+    assert not is_valid_address(CA[:31])
+    assert not is_valid_address("0" + CA[1:])
+    assert not is_valid_address("z" * 44)
+    assert filter_valid_addresses([CA, "nope", CA, OTHER]) == [CA, OTHER]
+
+
+def test_templates_extract_every_field():
+    assert extract_call(CALL, GROUP_ID) == (("Moon Token", "123,456.78", CA))
+    labeled = f"Token: Moon\nMarket Cap: $42,000\nContract: {CA}"
+    assert TEMPLATES["labeled"].extract(labeled) == ("Moon", "42,000", CA)
+    compact = f"Moon ($MOON)\n$42,000 MC\n{CA}\n"
+    assert TEMPLATES["compact"].extract(compact) == ("Moon ($MOON)", "42,000", CA)
+
+
+def test_template_does_not_cut_a_longer_run_down_to_an_address():
+    assert extract_call(CALL + "XYZ", GROUP_ID) is None
+    assert extract_contract(CALL + "XYZ", GROUP_ID) is None
+    # Punctuation and whitespace still end the address
+    assert extract_call(CALL + ".", GROUP_ID).contract_address == CA
+
+
+def test_scanner_tags_each_address_with_its_source():
+    text = f"https://pump.fun/coin/{CA} and dexscreener.com/solana/{OTHER} then {CA} again"
+    assert scan_links(text) == [LinkMatch(CA, SOURCE_PUMPFUN), LinkMatch(OTHER, SOURCE_DEXSCREENER)]
+    assert scan_links(f"bare {CA}") == [LinkMatch(CA, SOURCE_ADDRESS)]
+    assert scan_links(f"xyz{CA}") == [] and scan_links(f"{CA}XYZ") == []
+
+
+def test_fallback_prefers_labeled_then_links_then_a_lone_bare_address():
+    wallet = encode(bytes([9]) * 32)
+    assert extract_contract(f"sent from {wallet}\nca: {CA}", GROUP_ID).contract_address == CA
+    assert extract_contract(f"{wallet} aped https://pump.fun/{CA}", GROUP_ID).contract_address == CA
+    assert extract_contract(f"new one {CA}", GROUP_ID).contract_address == CA
+    # Two bare addresses: either may be a wallet or transaction, so neither is forwarded
+    assert extract_contract(f"{wallet} bought {CA}", GROUP_ID) is None
+
+
+def test_scanner_keeps_the_best_source_of_a_repeated_address():
+    assert scan_links(f"{CA} https://dexscreener.com/solana/{CA}") == [LinkMatch(CA, SOURCE_DEXSCREENER)]
+    assert scan_links(f"Contract: {CA}") == [LinkMatch(CA, SOURCE_LABELED)]
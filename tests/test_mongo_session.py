@@ -0,0 +1,74 @@
+import asyncio
+import repository
+from mongo_session import MongoSession, SessionStore
+
+DELAY = 0.05
+
+
+class FakeSessions:
+    """sessions collection stand-in that counts bulk writes and applies their upserts."""
+    def __init__(self):
+        self.writes = []
+        self.documents = {}
+
+    async def bulk_write(self, operations, ordered=True):
+        self.writes.append(len(operations))
+        for operation in operations:
+            user_id = operation._filter["user_id"]
+            self.documents.setdefault(user_id, {"user_id": user_id}).update(operation._doc["$set"])
+
+
+def make_store(monkeypatch):
+    collection = FakeSessions()
+    monkeypatch.setattr(repository, "sessions_collection", collection)
+    return SessionStore(DELAY), collection
+
+
+def change(session, dc_id):
+    session.set_dc(dc_id, "149.154.167.51", 443)
+    session.save()
+
+
+def test_saves_within_the_delay_become_one_bulk_write(monkeypatch):
+    store, collection = make_store(monkeypatch)
+
+    async def run():
+        sessions = [MongoSession(user_id, store=store) for user_id in range(3)]
+        for dc_id in (1, 2, 4):
+            for session in sessions:
+                change(session, dc_id)
+        assert collection.writes == []
+        await asyncio.sleep(DELAY * 3)
+        assert collection.writes == [3] and store.flushes == 1
+        # Serialized at flush time, so the newest state was written
+        assert all(collection.documents[s.user_id]["session_data"] == s.save_to_string() for s in sessions)
+
+    asyncio.run(run())
+
+
+def test_login_flush_writes_at_once_and_cancels_the_timer(monkeypatch):
+    store, collection = make_store(monkeypatch)
+
+    async def run():
+        session = MongoSession(1, store=store)
+        change(session, 2)
+        assert await store.flush() == 1
+        assert collection.writes == [1]
+        await asyncio.sleep(DELAY * 3)
+        assert collection.writes == [1]
+
+    asyncio.run(run())
+
+
+def test_discarded_session_is_not_written(monkeypatch):
+    store, collection = make_store(monkeypatch)
+
+    async def run():
+        stopped, running = MongoSession(1, store=store), MongoSession(2, store=store)
+        change(stopped, 2)
+        change(running, 2)
+        store.discard(stopped.user_id)
+        await store.close()
+        assert collection.writes == [1] and list(collection.documents) == [2]
+
+    asyncio.run(run())
@@ -0,0 +1,106 @@
+import time
+import asyncio
+from telethon.errors import FloodWaitError
+from forwarder.outbox import PRIORITY_URGENT, Outbox, TokenBucket
+
+FLOOD_WAIT = 0.3
+
+
+def flood_wait(seconds):
+    error = FloodWaitError(request=None, capture=1)
+    # Telegram only reports whole seconds; a shorter pause keeps the test fast
+    error.seconds = seconds
+    return error
+
+
+class FakeClient:
+    """Records every send and raises the next queued error for a destination, if any."""
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.sent = []
+
+    async def send_message(self, destination, text, **kwargs):
+        errors = self.errors.get(destination)
+        if errors:
+            raise errors.pop(0)
+        self.sent.append((destination, text, time.monotonic()))
+
+
+def test_bucket_refills_at_its_rate_up_to_the_burst(clock):
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.take() for _ in range(3)] == [0, 0, 0]
+    assert bucket.take() == 0.5
+    clock.now = 0.5
+    assert bucket.take() == 0
+    clock.now = 100
+    assert [bucket.take() for _ in range(4)] == [0, 0, 0, 0.5]
+
+
+def test_urgent_waiter_takes_the_next_token_before_normal_ones(clock):
+    async def run():
+        bucket = TokenBucket(rate=10, burst=1, clock=clock)
+        bucket.take()
+        order = []
+
+        async def acquire(label, urgent):
+            await bucket.acquire(urgent)
+            order.append(label)
+
+        normal = asyncio.ensure_future(acquire("normal", False))
+        await asyncio.sleep(0)
+        urgent = asyncio.ensure_future(acquire("urgent", True))
+        await asyncio.sleep(0)
+
+        # One token refills: the urgent caller gets it although the normal one waited longer
+        clock.now += 0.1
+        await asyncio.sleep(0.15)
+        assert order == ["urgent"]
+        clock.now += 0.1
+        await asyncio.wait_for(normal, 1)
+        await urgent
+        assert order == ["urgent", "normal"]
+
+    asyncio.run(run())
+
+
+def test_flood_wait_pauses_only_its_destination():
+    async def run():
+        client = FakeClient({1: [flood_wait(FLOOD_WAIT)]})
+        outbox = Outbox(client, destination_burst=10)
+        start = time.monotonic()
+        outbox.enqueue(1, "a")
+        outbox.enqueue(2, "b")
+        await asyncio.wait_for(outbox.drain(), 2)
+        sent = {destination: at - start for destination, _, at in client.sent}
+        assert sent[2] < FLOOD_WAIT <= sent[1]
+        assert outbox.flood_waits == 1 and outbox.retries == 1 and outbox.sent == 2
+        await outbox.close()
+
+    asyncio.run(run())
+
+
+def test_message_is_dropped_after_the_retry_budget():
+    async def run():
+        client = FakeClient({1: [RuntimeError("boom")] * 3})
+        outbox = Outbox(client, max_retries=2, retry_delay=0)
+        outbox.enqueue(1, "a")
+        await asyncio.wait_for(outbox.drain(), 1)
+        assert client.sent == [] and outbox.dropped == 1 and outbox.retries == 2
+        await outbox.close()
+
+    asyncio.run(run())
+
+
+def test_message_after_an_urgent_one_waits_for_its_dispatch():
+    async def run():
+        client = FakeClient()
+        outbox = Outbox(client, destination_rate=5, destination_burst=1)
+        # The bot destination's only token goes to an earlier message, so the urgent one waits ~0.2s
+        outbox.enqueue("bot", "earlier")
+        urgent = outbox.enqueue("bot", "buy", priority=PRIORITY_URGENT)
+        outbox.enqueue("group", "call", after=urgent)
+        await asyncio.wait_for(outbox.drain(), 2)
+        assert [text for _, text, _ in client.sent] == ["earlier", "buy", "call"]
+        await outbox.close()
+
+    asyncio.run(run())
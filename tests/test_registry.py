@@ -0,0 +1,143 @@
+import asyncio
+import forwarder.registry as registry_module
+from forwarder.registry import ClientRegistry
+
+
+class FakeClient:
+    """Fails to connect while its user is listed in `down`."""
+    down = set()
+
+    def __init__(self, user):
+        self.user = user
+
+    async def connect(self):
+        if self.user["_id"] in self.down:
+            raise OSError("timed out")
+
+    async def is_user_authorized(self):
+        return True
+
+    async def disconnect(self):
+        pass
+
+    def add_event_handler(self, callback, event):
+        pass
+
+
+class FakeSupervisor:
+    def __init__(self, client, user_id):
+        self.health = None
+
+    async def touch(self, update=None):
+        pass
+
+    async def run(self):
+        await asyncio.Event().wait()
+
+
+def make_registry(monkeypatch, users, clock):
+    async def find_users(query, fields=None):
+        return [dict(user) for user in users]
+
+    async def load_many(user_ids):
+        return {}
+
+    monkeypatch.setattr(registry_module, "find_users", find_users)
+    monkeypatch.setattr(registry_module, "register_forwarder", lambda client, user_id: lambda: None)
+    monkeypatch.setattr(registry_module, "ConnectionSupervisor", FakeSupervisor)
+    monkeypatch.setattr(registry_module.session_store, "load_many", load_many)
+    return ClientRegistry(FakeClient, retry_backoff=10, retry_backoff_max=40, clock=clock)
+
+
+def test_failed_client_is_retried_with_backoff(monkeypatch, clock):
+    users = [{"_id": 1, "session_name": "sessions/session_1", "logged_in_at": 1}]
+    registry = make_registry(monkeypatch, users, clock)
+
+    async def run():
+        FakeClient.down = {1}
+        assert await registry.sync() == ([], [])
+        assert registry.skipped[1].attempts == 1 and registry.skipped[1].retry_at == 10
+
+        # Not due yet: the user is not tried again
+        registry.clock.now = 5
+        await registry.sync()
+        assert registry.skipped[1].attempts == 1
+
+        registry.clock.now = 10
+        await registry.sync()
+        assert registry.skipped[1].attempts == 2 and registry.skipped[1].retry_at == 30
+
+        FakeClient.down = set()
+        registry.clock.now = 30
+        assert await registry.sync() == ([1], [])
+        assert 1 in registry.clients and not registry.skipped
+        await registry.close()
+
+    asyncio.run(run())
+
+
+def test_new_login_retries_at_once_and_logout_forgets_the_skip(monkeypatch, clock):
+    users = [{"_id": 1, "session_name": "sessions/session_1", "logged_in_at": 1}]
+    registry = make_registry(monkeypatch, users, clock)
+
+    async def run():
+        FakeClient.down = {1}
+        await registry.sync()
+        assert 1 in registry.skipped
+
+        # Same session name, new login: tried again without waiting for the backoff
+        users[0]["logged_in_at"] = 2
+        FakeClient.down = set()
+        assert await registry.sync() == ([1], [])
+
+        # Logging in again restarts the running client
+        users[0]["logged_in_at"] = 3
+        assert await registry.sync() == ([1], [1])
+
+        users.clear()
+        assert await registry.sync() == ([], [1])
+        assert not registry.clients and not registry.skipped
+        await registry.close()
+
+    asyncio.run(run())
+
+
+def test_logout_drops_a_pending_retry(monkeypatch, clock):
+    users = [{"_id": 1, "session_name": "sessions/session_1", "logged_in_at": 1}]
+    registry = make_registry(monkeypatch, users, clock)
+
+    async def run():
+        FakeClient.down = {1}
+        await registry.sync()
+        users.clear()
+        await registry.sync()
+        assert not registry.skipped and registry._retry_timer is None
+        await registry.close()
+
+    asyncio.run(run())
+
+
+def test_logout_discards_the_session_but_shutdown_keeps_it(monkeypatch, clock):
+    users = [{"_id": 1, "session_name": "sessions/session_1", "logged_in_at": 1}]
+    registry = make_registry(monkeypatch, users, clock)
+    discarded = []
+    monkeypatch.setattr(registry_module.session_store, "discard", discarded.append)
+
+    async def close():
+        pass
+
+    monkeypatch.setattr(registry_module.session_store, "close", close)
+
+    async def run():
+        FakeClient.down = set()
+        await registry.sync()
+        users.clear()
+        await registry.sync()
+        assert discarded == [1]
+
+        users.append({"_id": 2, "session_name": "sessions/session_2", "logged_in_at": 1})
+        await registry.sync()
+        await registry.close()
+        assert discarded == [1]
+
+    asyncio.run(run())
@@ -0,0 +1,40 @@
+import asyncio
+import repository
+
+
+class FakeGroupConfigs:
+    """The few group_configs operations the admin bot's toggle uses, keyed like the unique index."""
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, query, projection=None):
+        return self.documents.get((query["user_id"], query["group_id"]))
+
+    async def update_one(self, query, update, upsert=False):
+        key = (query["user_id"], query["group_id"])
+        if key in self.documents or upsert:
+            self.documents.setdefault(key, dict(query)).update(update["$set"])
+
+
+def test_toggle_reads_each_users_own_state(monkeypatch):
+    collection = FakeGroupConfigs()
+    monkeypatch.setattr(repository, "group_configs_collection", collection)
+    bumps = []
+
+    async def bump_config_version():
+        bumps.append(None)
+
+    monkeypatch.setattr(repository, "bump_config_version", bump_config_version)
+
+    async def run():
+        # Unconfigured groups are off, so the first toggle turns them on for that user only
+        assert await repository.toggle_group_active(1, "-100123")
+        assert await repository.toggle_group_active(2, "-100123")
+        assert not await repository.toggle_group_active(1, "-100123")
+        assert collection.documents[(2, "-100123")]["active"]
+        # Configs written without the flag are active
+        collection.documents[(3, "-100123")] = {"user_id": 3, "group_id": "-100123", "notifier": "x"}
+        assert not await repository.toggle_group_active(3, "-100123")
+
+    asyncio.run(run())
+    assert len(bumps) == 4
@@ -0,0 +1,32 @@
+import asyncio
+from forwarder.startup import start_clients
+
+
+class FakeClient:
+    """Connects instantly; user 1 cannot connect and no client can disconnect cleanly."""
+    def __init__(self, user):
+        self.user = user
+
+    async def connect(self):
+        if self.user["_id"] == 1:
+            raise OSError("network unreachable")
+
+    async def is_user_authorized(self):
+        return True
+
+    async def disconnect(self):
+        raise RuntimeError("already closed")
+
+
+def test_one_failing_user_does_not_abort_the_others():
+    ready = []
+
+    def on_ready(client, user):
+        if user["_id"] == 2:
+            raise ValueError("bad config")
+        ready.append(user["_id"])
+
+    users = [{"_id": user_id} for user_id in range(5)]
+    clients, skipped = asyncio.run(start_clients(users, FakeClient, on_ready))
+    assert sorted(ready) == [0, 3, 4] and len(clients) == 3
+    assert skipped == {1: "connection failed: network unreachable", 2: "client could not be set up: bad config"}
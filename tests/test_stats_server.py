@@ -0,0 +1,12 @@
+import socket
+import asyncio
+from forwarder.stats_server import serve_stats
+
+
+def test_bound_port_is_logged_not_raised(caplog):
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+        asyncio.run(asyncio.wait_for(serve_stats(port=port), 1))
+    assert f"127.0.0.1:{port}" in caplog.text
@@ -0,0 +1,69 @@
+import os
+import sys
+import signal
+import asyncio
+import subprocess
+from pathlib import Path
+from forwarder.supervisor import Supervisor
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Workers that report their pid and ignore SIGTERM unless told otherwise
+WORKER = (
+    "import os, sys, time, signal\n"
+    "if sys.argv[1] == 'stubborn':\n"
+    "    signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+    "os.write(1, f'{os.getpid()}\\n'.encode())\n"
+    "time.sleep(60)\n"
+)
+
+SUPERVISOR = (
+    "import sys, asyncio\n"
+    "from forwarder.supervisor import Supervisor\n"
+    "class TestSupervisor(Supervisor):\n"
+    "    def command(self, shard):\n"
+    "        return [sys.executable, '-c', sys.argv[1], 'polite']\n"
+    "asyncio.run(TestSupervisor(2).run())\n"
+)
+
+
+class StubbornSupervisor(Supervisor):
+    def command(self, shard):
+        return [sys.executable, "-c", WORKER, "stubborn"]
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_stop_kills_workers_that_ignore_sigterm():
+    async def run():
+        supervisor = StubbornSupervisor(1, stop_timeout=0.5)
+        task = asyncio.ensure_future(supervisor._watch(0))
+        while supervisor._processes[0] is None:
+            await asyncio.sleep(0.01)
+        process = supervisor._processes[0]
+        # Wait until the worker has installed its SIGTERM handler
+        await asyncio.sleep(0.5)
+        await asyncio.wait_for(supervisor.stop(), 5)
+        assert process.returncode == -signal.SIGKILL
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+
+def test_sigterm_stops_every_worker():
+    supervisor = subprocess.Popen(
+        [sys.executable, "-c", SUPERVISOR, WORKER], cwd=ROOT, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        pids = [int(supervisor.stdout.readline()) for _ in range(2)]
+        supervisor.send_signal(signal.SIGTERM)
+        supervisor.wait(10)
+        assert not any(is_running(pid) for pid in pids)
+    finally:
+        supervisor.kill()